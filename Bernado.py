@@ -1,4 +1,10 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.constants import PROFILE_DIR, PROFILE_SAMPLE_INTERVAL, TIMING_LOG_FILE
+from utils.data_loaders import dataset_snapshot, start_refresh_scheduler, warm_up_datasets
+from utils.helpers import filter_state, profiling_enabled, render_data_status, render_timings, timing_enabled
+from utils.profiling import profile_call
+from utils.timing import append_jsonl, finish_rerun, start_rerun
 
 # Configurare pagină
 st.set_page_config(
@@ -6,6 +12,12 @@ st.set_page_config(
     layout="wide"
 )
 
+# Încărcare în paralel a tuturor fișierelor de date, o singură dată per proces
+warm_up_datasets()
+
+# Reîncărcare în fundal a seturilor de date când ERP-ul înlocuiește fișierele
+start_refresh_scheduler()
+
 # Definirea paginilor cu noua structură st.navigation
 pages = {
     "Brenado For House": [
@@ -20,4 +32,35 @@ pages = {
 
 # Crearea și rularea navigației
 pg = st.navigation(pages)
-pg.run()
+
+
+def run_page():
+    """
+    Rularea paginii pe versiunile seturilor de date publicate la începutul ei,
+    profilată la cerere (vezi utils/profiling.py)
+    """
+    with dataset_snapshot() as snapshot:
+        render_data_status(snapshot)
+        if profiling_enabled():
+            prefix = profile_call(pg.run, PROFILE_DIR, pg.title, filter_state(), PROFILE_SAMPLE_INTERVAL)
+            st.sidebar.caption(f"🔬 Profil salvat: {prefix}.*")
+        else:
+            pg.run()
+
+
+if timing_enabled():
+    # Durata fazelor paginii (vezi utils/timing.py), în bara laterală și în jurnalul JSONL
+    ctx = get_script_run_ctx()
+    start_rerun(ctx.session_id if ctx else None, pg.title)
+    try:
+        run_page()
+    finally:
+        # Și rulările întrerupte de o excepție (inclusiv st.stop / o nouă rulare) ajung în jurnal
+        record = finish_rerun(filter_state())
+        try:
+            append_jsonl(TIMING_LOG_FILE, record)
+            render_timings(record)
+        except Exception:
+            pass  # Jurnalul de depanare nu înlocuiește excepția paginii
+else:
+    run_page()
@@ -0,0 +1,3 @@
+"""
+Benchmark-uri headless pentru paginile aplicației, pe date sintetice
+"""
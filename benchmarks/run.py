@@ -0,0 +1,374 @@
+"""
+Benchmark headless al paginilor, pe fișiere sintetice de diferite volume.
+
+Pentru fiecare volum (rânduri de vânzări) se generează fișierele din
+DATA_FILES (vezi benchmarks/synthetic.py), apoi fiecare pagină rulează
+prin AppTest într-un proces separat - cache-uri reci, memorie de vârf
+proprie. Se măsoară încărcarea seturilor de date, structurile derivate
+(indexuri, cuburi, KPI, vechimi), prima rulare și rerularea paginii și
+fiecare interacțiune de filtrare. Raportul JSON are chei stabile, ca să
+poată fi comparat între versiuni (--baseline).
+
+Utilizare:
+    python -m benchmarks.run --rows 9890 100000 1000000 --output bench_report.json
+    python -m benchmarks.run --baseline bench_report.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Interacțiunile de filtrare: (nume, tip widget, cheie, valoare); o valoare
+# FIRST(n) selectează primele n opțiuni disponibile în acel moment
+FIRST = 'first'
+
+PAGES = {
+    'vanzari': {
+        'datasets': ['vanzari', 'ytd'],
+        'filters': [
+            ('zi_si_clienti', 'radio', 'view_type_radio', "Zi și Clienți"),
+            ('top_produse', 'radio', 'view_type_radio', "Top Produse"),
+            ('standard', 'radio', 'view_type_radio', "Standard"),
+            ('produse', 'multiselect', 'produs_filter', (FIRST, 3)),
+            ('comparatie_ytd', 'selectbox', 'comparatie_perioada', "Anul până azi (YTD)"),
+            ('comparatie_3_ani', 'multiselect', 'comparatie_ani', [1, 2, 3]),
+        ],
+    },
+    'balanta_stocuri': {
+        'datasets': ['balanta_la_data', 'balanta_perioada'],
+        'filters': [
+            ('gestiune', 'multiselect', 'gestiune_filter_tab1', (FIRST, 1)),
+            ('producator', 'multiselect', 'producator_filter_tab1', (FIRST, 2)),
+            ('perioada_furnizor', 'multiselect', 'furnizor_filter_tab2', (FIRST, 2)),
+        ],
+    },
+    'cumparari_intrari': {
+        'datasets': ['cumparari_ciis', 'cumparari_cipd'],
+        'filters': [
+            ('ciis_furnizor', 'multiselect', 'ciis_furnizor', (FIRST, 3)),
+            ('cipd_grupa', 'multiselect', 'cipd_grupa', (FIRST, 2)),
+        ],
+    },
+    'facturi_neincasate': {
+        'datasets': ['neincasate'],
+        'filters': [
+            ('client', 'multiselect', 'client_filter', (FIRST, 3)),
+            ('agent', 'multiselect', 'agent_filter', (FIRST, 1)),
+        ],
+    },
+    'facturi_neachitate': {
+        'datasets': ['neachitate'],
+        'filters': [
+            ('furnizor', 'multiselect', 'furnizor_filter', (FIRST, 3)),
+            ('scadenta_luna', 'selectbox', 'scadenta_filter', "Luna Curentă"),
+        ],
+    },
+    'scadente_plati': {
+        'datasets': ['scadente_plati'],
+        'filters': [
+            ('tert', 'multiselect', 'tert_filter', (FIRST, 3)),
+            ('data_scadenta', 'multiselect', 'data_scadenta_filter', (FIRST, 2)),
+        ],
+    },
+}
+
+# Diferențele sub acest prag (secunde) sunt zgomot, nu regresii
+NOISE_SECONDS = 0.05
+
+
+def _peak_rss_mb():
+    """Memoria rezidentă de vârf a procesului curent (MB)"""
+    # Pe Linux, ru_maxrss păstrează și vârful procesului părinte de dinaintea
+    # lui exec; VmHWM este doar al procesului curent
+    try:
+        with open('/proc/self/status', encoding='ascii') as handle:
+            for line in handle:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux raportează în KB, macOS în octeți
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return round(time.perf_counter() - start, 4), result
+
+
+# ===== PROCESE DE MĂSURARE =====
+
+def _measure_parse():
+    """Parsarea fiecărui fișier Excel (cu scrierea snapshot-ului), apoi citirea din snapshot"""
+    from utils.constants import DATA_FILES, DATASET_COLUMNS, DATASET_SCHEMAS, SNAPSHOT_DIR
+    from utils.snapshots import read_excel_snapshot
+
+    shutil.rmtree(SNAPSHOT_DIR, ignore_errors=True)
+    results = {}
+    for dataset, path in DATA_FILES.items():
+        args = (path, DATASET_COLUMNS.get(dataset), DATASET_SCHEMAS.get(dataset))
+        parse_seconds, df = _timed(read_excel_snapshot, *args)
+        snapshot_seconds, _ = _timed(read_excel_snapshot, *args)
+        results[dataset] = {
+            'rows': len(df),
+            'parse_seconds': parse_seconds,
+            'snapshot_seconds': snapshot_seconds,
+        }
+    results['peak_rss_mb'] = _peak_rss_mb()
+    return results
+
+
+def _derived_builders(dataset):
+    """Structurile derivate construite pentru un set de date, în ordinea din pagini"""
+    from utils import data_loaders
+    from utils.constants import (
+        DATASET_AGING, DATASET_CUBES, DATASET_HIERARCHIES, DATASET_INDEXES, DATASET_KPIS,
+    )
+
+    builders = {}
+    if dataset in DATASET_INDEXES:
+        builders['indexes'] = data_loaders.load_indexes
+    if dataset in DATASET_HIERARCHIES:
+        builders['hierarchy'] = data_loaders.load_hierarchy
+    if dataset in DATASET_CUBES:
+        builders['cube'] = lambda df: data_loaders.load_cube(df, dataset)
+    if dataset in DATASET_KPIS:
+        builders['kpis'] = data_loaders.load_kpis
+    if dataset in DATASET_AGING:
+        builders['aging'] = lambda df: data_loaders.load_aging(df, dataset, date.today())
+    return builders
+
+
+def _resolve_value(widget, value):
+    if isinstance(value, tuple) and value[0] == FIRST:
+        return list(widget.options[:value[1]])
+    return value
+
+
+def _measure_page(page):
+    """Încărcare, agregare, randare și filtrare pentru o pagină, într-un proces nou"""
+    from streamlit.testing.v1 import AppTest
+    from utils import data_loaders
+
+    spec = PAGES[page]
+    result = {'baseline_rss_mb': _peak_rss_mb()}
+
+    # Încărcarea seturilor de date (din snapshot-urile scrise de _measure_parse)
+    frames = {}
+    result['load_seconds'] = {}
+    for dataset in spec['datasets']:
+        seconds, frames[dataset] = _timed(data_loaders.load_dataset, dataset)
+        result['load_seconds'][dataset] = seconds
+    result['load_rss_mb'] = _peak_rss_mb()
+
+    # Structurile derivate, calculate o dată per versiune de date
+    result['aggregate_seconds'] = {}
+    for dataset, df in frames.items():
+        for name, build in _derived_builders(dataset).items():
+            seconds, _ = _timed(build, df)
+            result['aggregate_seconds'][f"{dataset}.{name}"] = seconds
+    result['aggregate_rss_mb'] = _peak_rss_mb()
+
+    # Randarea paginii: prima rulare (construiește figurile) și o rerulare
+    at = AppTest.from_file(os.path.join(ROOT, 'pages', f"{page}.py"), default_timeout=3600)
+    first_seconds, _ = _timed(at.run)
+    rerun_seconds, _ = _timed(at.run)
+    result['render_seconds'] = {'first': first_seconds, 'rerun': rerun_seconds}
+    result['render_rss_mb'] = _peak_rss_mb()
+
+    # Interacțiunile de filtrare, aplicate cumulativ
+    result['filter_seconds'] = {}
+    for name, widget_type, key, value in spec['filters']:
+        try:
+            widget = getattr(at, widget_type)(key=key)
+        except KeyError:
+            result['filter_seconds'][name] = None  # Widget-ul nu există la acest volum
+            continue
+        widget.set_value(_resolve_value(widget, value))
+        seconds, _ = _timed(at.run)
+        result['filter_seconds'][name] = seconds
+
+    result['peak_rss_mb'] = _peak_rss_mb()
+    result['exceptions'] = [exception.message for exception in at.exception]
+    return result
+
+
+def _run_worker(mode, data_root, page=None, timeout=None):
+    """Rulează o măsurare într-un proces nou, cu directorul curent `data_root`"""
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as handle:
+        result_path = handle.name
+    command = [sys.executable, '-m', 'benchmarks.run', '--worker', mode, '--result', result_path]
+    if page:
+        command += ['--page', page]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    try:
+        completed = subprocess.run(command, cwd=data_root, env=env, capture_output=True, text=True, timeout=timeout)
+        if completed.returncode != 0:
+            return {'error': completed.stderr.strip().splitlines()[-1:] or ['exit code %d' % completed.returncode]}
+        with open(result_path, encoding='utf-8') as handle:
+            return json.load(handle)
+    except subprocess.TimeoutExpired:
+        return {'error': [f"timeout după {timeout} s"]}
+    finally:
+        os.unlink(result_path)
+
+
+# ===== RAPORT =====
+
+def _prepare_data(work_dir, sales_rows, seed, end):
+    """Directorul cu fișierele sintetice pentru un volum; generat o singură dată"""
+    from benchmarks.synthetic import generate_data_dir
+
+    data_root = os.path.join(work_dir, f"vanzari-{sales_rows}-seed{seed}-{end.isoformat()}")
+    marker = os.path.join(data_root, 'rows.json')
+    if os.path.exists(marker):
+        with open(marker, encoding='utf-8') as handle:
+            return data_root, json.load(handle), None
+
+    shutil.rmtree(data_root, ignore_errors=True)
+    seconds, rows = _timed(generate_data_dir, data_root, sales_rows, seed, end)
+    with open(marker, 'w', encoding='utf-8') as handle:
+        json.dump(rows, handle)
+    return data_root, rows, seconds
+
+
+def _environment():
+    import numpy
+    import pandas
+    import pyarrow
+    import streamlit
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    try:
+        import duckdb
+        duckdb_version = duckdb.__version__
+    except ImportError:
+        duckdb_version = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': {
+            'streamlit': streamlit.__version__,
+            'pandas': pandas.__version__,
+            'numpy': numpy.__version__,
+            'pyarrow': pyarrow.__version__,
+            'duckdb': duckdb_version,
+        },
+    }
+
+
+def _flatten(value, prefix=""):
+    """Valorile numerice ale raportului, pe căi de forma runs.9890.pages.vanzari.render_seconds.first"""
+    if isinstance(value, dict):
+        items = {}
+        for key, item in value.items():
+            items.update(_flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return items
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def compare_reports(baseline, report, threshold):
+    """
+    Timpii (`*_seconds`) și memoria de vârf (`*_rss_mb`) care au crescut cu
+    peste `threshold` (fracție) față de `baseline`, pe aceleași căi.
+    """
+    old, new = _flatten(baseline.get('runs', {})), _flatten(report.get('runs', {}))
+    regressions = []
+    for path, value in sorted(new.items()):
+        previous = old.get(path)
+        if previous is None or not ('_seconds' in path or path.endswith('_rss_mb')):
+            continue
+        if '_seconds' in path and value - previous < NOISE_SECONDS:
+            continue
+        if previous > 0 and value > previous * (1 + threshold):
+            regressions.append({'metric': path, 'baseline': previous, 'current': value,
+                                'change': round(value / previous - 1, 3)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark headless al paginilor pe date sintetice")
+    parser.add_argument('--rows', type=int, nargs='+', default=[9890],
+                        help="Rândurile de vânzări (VS.xlsx) pentru fiecare rulare")
+    parser.add_argument('--pages', nargs='+', choices=list(PAGES), default=list(PAGES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--end-date', type=date.fromisoformat, default=None,
+                        help="Ultima zi din date (implicit azi)")
+    parser.add_argument('--work-dir', default=os.path.join(ROOT, 'benchmarks', '.data'),
+                        help="Directorul fișierelor sintetice, refolosite între rulări")
+    parser.add_argument('--output', default='bench_report.json')
+    parser.add_argument('--baseline', help="Raport anterior cu care se compară rezultatul")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Creșterea relativă raportată ca regresie (implicit 20%%)")
+    parser.add_argument('--timeout', type=int, default=3600, help="Limita (secunde) pentru fiecare proces")
+    parser.add_argument('--worker', choices=['parse', 'page'], help=argparse.SUPPRESS)
+    parser.add_argument('--page', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        result = _measure_parse() if args.worker == 'parse' else _measure_page(args.page)
+        with open(args.result, 'w', encoding='utf-8') as handle:
+            json.dump(result, handle)
+        return 0
+
+    end = args.end_date or date.today()
+    report = {
+        'schema': 1,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'end_date': end.isoformat(),
+        'seed': args.seed,
+        'environment': _environment(),
+        'runs': {},
+    }
+    for sales_rows in args.rows:
+        print(f"[{sales_rows:,} rânduri] generare date...", file=sys.stderr)
+        data_root, rows, generate_seconds = _prepare_data(args.work_dir, sales_rows, args.seed, end)
+        run = {'rows': rows, 'generate_seconds': generate_seconds}
+
+        print(f"[{sales_rows:,} rânduri] parsare fișiere...", file=sys.stderr)
+        run['datasets'] = _run_worker('parse', data_root, timeout=args.timeout)
+
+        run['pages'] = {}
+        for page in args.pages:
+            print(f"[{sales_rows:,} rânduri] pagina {page}...", file=sys.stderr)
+            run['pages'][page] = _run_worker('page', data_root, page, timeout=args.timeout)
+        report['runs'][str(sales_rows)] = run
+
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2, sort_keys=True, ensure_ascii=False)
+    print(f"Raport scris în {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            regressions = compare_reports(json.load(handle), report, args.threshold)
+        for item in regressions:
+            print(f"REGRESIE {item['metric']}: {item['baseline']} -> {item['current']} "
+                  f"({item['change']:+.0%})", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
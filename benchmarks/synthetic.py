@@ -0,0 +1,378 @@
+"""
+Generator de fișiere Excel sintetice, cu coloanele exporturilor din ERP.
+
+Volumul se dă prin numărul de rânduri de vânzări (VS.xlsx); celelalte
+fișiere cresc proporțional față de volumul actual, iar nomenclatoarele
+(produse, clienți, furnizori) cu rădăcina pătrată a factorului de scară.
+Datele sunt deterministe pentru aceeași sămânță.
+"""
+
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from utils.constants import DATA_FILES
+
+# Volumul actual (rânduri) al fiecărui fișier - scara 1
+BASE_ROWS = {
+    'vanzari': 9890,
+    'balanta_la_data': 17053,
+    'balanta_perioada': 1398,
+    'neachitate': 512,
+    'neincasate': 1300,
+    'scadente_plati': 230,
+    'cumparari_ciis': 1133,
+    'cumparari_cipd': 1398,
+    'ytd': 9890,
+}
+
+# Rândurile de date dintr-o foaie Excel (fără antet)
+EXCEL_MAX_ROWS = 1048575
+
+# Numărul de zile acoperite de vânzări la scara 1; crește cu volumul, până la 3 ani
+BASE_DAYS = 30
+MAX_DAYS = 3 * 365
+
+GESTIUNI = ['Gestiune Centru', 'Gestiune Nord', 'Gestiune Sud', 'Depozit Central']
+UNITS = ['buc', 'sac', 'mp', 'ml', 'kg', 'l', 'set', 'cutie', 'rola', 'mc', 'pach', 'palet', 'to', 'per', 'm', 'g']
+
+
+class _Catalog:
+    """Nomenclatoarele comune fișierelor (produse, parteneri, agenți) la o anumită scară"""
+
+    def __init__(self, rng, scale):
+        def count(base):
+            return max(base, int(base * np.sqrt(scale)))
+
+        self.products = count(4000)
+        self.product_names = _names("Produs", self.products)
+        self.product_codes = _names("COD", self.products)
+        self.product_groups = rng.integers(0, 20, self.products)
+        self.product_units = rng.integers(0, len(UNITS), self.products)
+        self.product_producers = rng.integers(0, count(120), self.products)
+        self.product_prices = np.round(rng.lognormal(3.5, 1.0, self.products), 2)
+
+        self.groups = _names("GRUPA", 20)
+        self.producers = _names("PRODUCATOR", count(120), suffix=" SRL")
+        self.clients = _names("Client", count(200), suffix=" SRL")
+        self.suppliers = _names("Furnizor", count(120), suffix=" SRL")
+        self.agents = _names("Agent", 10)
+
+
+def _names(prefix, count, suffix=""):
+    return np.array([f"{prefix} {i:05d}{suffix}" for i in range(count)], dtype=object)
+
+
+def _skewed(rng, count, size):
+    """Indici în [0, count) cu distribuție Zipf - câteva valori frecvente, coadă lungă"""
+    weights = 1.0 / np.arange(1, count + 1)
+    return rng.choice(count, size=size, p=weights / weights.sum())
+
+
+def _days(rng, size, start, days):
+    return pd.to_datetime(start) + pd.to_timedelta(rng.integers(0, days, size), unit='D')
+
+
+def _sales(rng, catalog, rows, end, days):
+    start = end - timedelta(days=days - 1)
+    product = _skewed(rng, catalog.products, rows)
+    client = _skewed(rng, len(catalog.clients), rows)
+    gestiune = rng.integers(0, 3, rows)
+    quantity = rng.integers(1, 20, rows).astype(float)
+    price = catalog.product_prices[product]
+    value = np.round(quantity * price, 2)
+    margin = np.round(value * rng.uniform(0.1, 0.35, rows), 2)
+    cost = value - margin
+    documents = np.sort(rng.integers(0, max(1, rows // 3), rows))
+    return pd.DataFrame({
+        'DenumireGestiune': np.array(GESTIUNI)[gestiune],
+        'Denumire grupa': catalog.groups[catalog.product_groups[product]],
+        'Denumire': catalog.product_names[product],
+        'Numar fisa': 250000000 + documents,
+        'Cod': catalog.product_codes[product],
+        'UM': np.array(UNITS)[catalog.product_units[product]],
+        'Cantitate': quantity,
+        'Pret Contabil': price,
+        'Pret': price,
+        'Valoare Contabila': value,
+        'Valoare': value,
+        'Adaos': margin,
+        'Cost': cost,
+        'TVA %': rng.choice([0.19, 0.09, 0.05], rows),
+        'PretIntrare': np.round(cost / quantity, 2),
+        'Client': catalog.clients[client],
+        'Numar': 250700000 + documents,
+        'Serie': np.where(rng.random(rows) < 0.3, pd.Series(documents).map("BFHT.{:06d}".format), None),
+        'Data': _days(rng, rows, start, days),
+        'Tip': rng.choice(['AIM', 'FC', 'BC', 'AVZ', 'BON'], rows),
+        'Adaos/ValoareContabila': np.round(margin / value, 6),
+        'Adaos/(ValoareContabila-Adaos)': np.round(margin / np.where(cost == 0, 1, cost), 6),
+        'Agent': catalog.agents[_skewed(rng, len(catalog.agents), rows)],
+        'CodFiscal': np.array([f"RO{10000000 + i}" for i in range(len(catalog.clients))], dtype=object)[client],
+        'Delegat': np.where(rng.random(rows) < 0.25, catalog.agents[rng.integers(0, len(catalog.agents), rows)], None),
+        'Categorie': rng.choice(['371   - Marfuri', '345   - Produse finite'], rows),
+        'Producator': catalog.producers[catalog.product_producers[product]],
+        'CategorieProdus': 'Categorie',
+        'Ramura': 'Ramura',
+        'CategorieTert': 'NECUNOSCUT',
+        'Locatie Tert': 'NECUNOSCUT',
+        'Serie lot': None,
+        'Data Expirare': None,
+        'Declaratie conformitate': None,
+        'Gestiune': gestiune + 1,
+        'PL': rng.choice(['PL 01', '02'], rows),
+    })
+
+
+def _stock_at_date(rng, catalog, rows):
+    product = rng.integers(0, catalog.products, rows)
+    price = catalog.product_prices[product]
+    stock = rng.integers(1, 200, rows).astype(float)
+    sale_price = np.round(price * rng.uniform(1.1, 1.5, rows), 2)
+    return pd.DataFrame({
+        'DenumireGest': np.array(GESTIUNI)[rng.integers(0, len(GESTIUNI), rows)],
+        'Denumire': catalog.product_names[product],
+        'UM': np.array(UNITS)[catalog.product_units[product]],
+        'Pret': price,
+        'Stoc final': stock,
+        'ValoareStocFinal': np.round(price * stock, 2),
+        'PretVanzare': sale_price,
+        'ValoareVanzare': np.round(sale_price * stock, 2),
+        'Producator': catalog.producers[catalog.product_producers[product]],
+    })
+
+
+def _stock_period(rng, catalog, rows):
+    product = rng.integers(0, catalog.products, rows)
+    price = catalog.product_prices[product]
+    stock = rng.integers(0, 200, rows).astype(float)
+    return pd.DataFrame({
+        'Denumire gestiune': np.array(GESTIUNI)[rng.integers(0, 3, rows)],
+        'Denumire': catalog.product_names[product],
+        'UM': np.array(UNITS)[catalog.product_units[product]],
+        'Furnizor IN': catalog.suppliers[_skewed(rng, len(catalog.suppliers), rows)],
+        'Stoc final': stock,
+        'Valoare intrare': np.round(price * rng.integers(1, 300, rows), 2),
+        'Pret vanzare': np.round(price * rng.uniform(1.1, 1.5, rows), 2),
+        'Producator': catalog.producers[catalog.product_producers[product]],
+    })
+
+
+def _payables(rng, catalog, rows, end):
+    total = np.round(rng.lognormal(7.5, 1.2, rows), 2)
+    paid = np.round(total * np.where(rng.random(rows) < 0.2, rng.uniform(0, 1, rows), 0), 2)
+    issued = _days(rng, rows, end - timedelta(days=400), 400)
+    return pd.DataFrame({
+        'Valuta': rng.choice(['LEI', 'EUR'], rows, p=[0.8, 0.2]),
+        'Furnizor': catalog.suppliers[_skewed(rng, len(catalog.suppliers), rows)],
+        'Tip': rng.choice(['FF', 'FFA'], rows),
+        'Data': issued,
+        'Numar': 240000000 + np.arange(rows),
+        'Serie': pd.Series(np.arange(rows)).map("{:06d}".format),
+        'IndexIncarcare': np.where(rng.random(rows) < 0.97, 5000000000 + np.arange(rows), np.nan),
+        'Total': total,
+        'Total_V': 0.0,
+        'Sold': total - paid,
+        'Sold_V': 0.0,
+        'Achitat': paid,
+        'Achitat_V': 0,
+        'DataScadenta': issued + pd.to_timedelta(rng.integers(0, 120, rows), unit='D'),
+        'ModPlata': None,
+        'PL': rng.choice(['PL 01', 'PL 02'], rows),
+        'AchitatEfecte': np.where(rng.random(rows) < 0.3, np.round(total * rng.uniform(0.1, 1, rows), 2), 0.0),
+    })
+
+
+def _receivables(rng, catalog, rows, end):
+    total = np.round(rng.lognormal(7.0, 1.1, rows), 2)
+    paid = np.round(total * np.where(rng.random(rows) < 0.15, rng.uniform(0, 1, rows), 0), 2)
+    issued = _days(rng, rows, end - timedelta(days=280), 280)
+    return pd.DataFrame({
+        'Valuta': 'LEI',
+        'Client': catalog.clients[_skewed(rng, len(catalog.clients), rows)],
+        'Data': issued,
+        'NumarDoc': 250000000 + np.arange(rows),
+        'Tip': rng.choice(['FC', 'FCA', 'AVZ', 'BC', 'FCS'], rows),
+        'Serie': pd.Series(np.arange(rows)).map("BFHT.{:06d}".format),
+        'Total': total,
+        'Total_V': 0,
+        'Sold': total - paid,
+        'Sold_V': 0,
+        'Achitat': paid,
+        'Achitat_V': 0,
+        'DataScadenta': issued + pd.to_timedelta(rng.integers(0, 60, rows), unit='D'),
+        'Agent': catalog.agents[_skewed(rng, len(catalog.agents), rows)],
+        'ModPlata': None,
+    })
+
+
+def _payment_instruments(rng, catalog, rows, end):
+    issued = _days(rng, rows, end - timedelta(days=180), 180)
+    return pd.DataFrame({
+        'StareLaData': 'Spre decontare',
+        'Numar': 250100000 + np.arange(rows),
+        'Tip': 'BOP',
+        'Data': issued,
+        'DataScadenta': issued + pd.to_timedelta(rng.integers(30, 240, rows), unit='D'),
+        'DataEmiterii': issued,
+        'Emitent': 'EMITENT SRL',
+        'Tert': catalog.suppliers[_skewed(rng, len(catalog.suppliers), rows)],
+        'Suma': np.round(rng.choice([5000, 10000, 25000, 50000], rows) * rng.uniform(0.5, 1.5, rows), 2),
+        'Avans': 0.0,
+        'Serie': pd.Series(np.arange(rows)).map("BACX.{:07d}".format),
+        'NrGirari': 0,
+        'ContContabil': '5113.LEI.000',
+        'Banca': 'Banca 1',
+        'ContEmitent': 'RO00BANK0000000000000000',
+        'BancaEmitent': 'Banca 2',
+        'StareCurenta': 'Spre decontare',
+        'Agent': 'NECUNOSCUT',
+    })
+
+
+def _receptions(rng, catalog, rows, end, days):
+    product = _skewed(rng, catalog.products, rows)
+    quantity = rng.integers(1, 300, rows).astype(float)
+    price = np.round(catalog.product_prices[product] * 0.8, 2)
+    documents = rng.integers(0, max(1, rows // 6), rows)
+    supplier = documents % len(catalog.suppliers)
+    return pd.DataFrame({
+        'Gestiune': np.array(GESTIUNI)[documents % 3],
+        'Denumire grupa': catalog.groups[catalog.product_groups[product]],
+        'Denumire': catalog.product_names[product],
+        'Numar fisa': 250700000 + np.arange(rows),
+        'Cod': catalog.product_codes[product],
+        'UM': np.array(UNITS)[catalog.product_units[product]],
+        'Cantitate': quantity,
+        'Pret': price,
+        'Valoare': np.round(quantity * price, 2),
+        'Furnizor': catalog.suppliers[supplier],
+        'Numar': 250700000 + documents,
+        'Serie': pd.Series(documents).map("F{:07d}".format),
+        'Data': _days(rng, rows, end - timedelta(days=days - 1), days),
+        'Tip': rng.choice(['NIR', 'NIRA', 'BT'], rows),
+        'Producator': catalog.producers[catalog.product_producers[product]],
+        'Serie lot': None,
+        'Data Expirare': None,
+        'Declaratie conformitate': None,
+        'NrGestiune': documents % 3 + 1,
+        'PL': rng.choice(['PL 01', '02'], rows),
+    })
+
+
+def _purchase_documents(rng, catalog, rows, end, days):
+    product = _skewed(rng, catalog.products, rows)
+    quantity = rng.integers(1, 300, rows).astype(float)
+    price = np.round(catalog.product_prices[product] * 0.8, 2)
+    discount_rate = rng.choice([0.0, 0.0, 0.0, 0.02, 0.05, 0.1], rows)
+    full_value = np.round(quantity * price, 2)
+    discount = np.round(full_value * discount_rate, 2)
+    value = full_value - discount
+    documents = rng.integers(0, max(1, rows // 6), rows)
+    currency = np.where(documents % 5 == 0, 'EUR', 'LEI')
+    rate = np.where(currency == 'EUR', 5.0, 1.0)
+    return pd.DataFrame({
+        'Valuta': currency,
+        'Furnizor': catalog.suppliers[documents % len(catalog.suppliers)],
+        'Data': _days(rng, rows, end - timedelta(days=days - 1), days),
+        'Numar': 250700000 + documents,
+        'Serie': pd.Series(documents).map("FF{:07d}".format),
+        'Tip': rng.choice(['FF', 'FFA', 'AVZ'], rows),
+        'Grupa': catalog.groups[catalog.product_groups[product]],
+        'Denumire': catalog.product_names[product],
+        'Cod': catalog.product_codes[product],
+        'UM': np.array(UNITS)[catalog.product_units[product]],
+        'Cantitate': quantity,
+        'Pret': price,
+        'PretValuta': np.round(price / rate, 2),
+        'Valoare': value,
+        'ValoareValuta': np.round(value / rate, 2),
+        'Discount %': discount_rate,
+        'Discount': discount,
+        'DiscountValuta': np.round(discount / rate, 2),
+        'PretIntreg': price,
+        'PretValutaIntreg': np.round(price / rate, 2),
+        'ValoareIntreg': full_value,
+        'ValoareValutaIntreg': np.round(full_value / rate, 2),
+        'TVA %': rng.choice([0.19, 0.09, 0.05], rows),
+        'Categorie': rng.choice(['371   - Marfuri', '302   - Materiale consumabile'], rows),
+        'Gestiune': np.array(GESTIUNI)[documents % len(GESTIUNI)],
+        'PL': rng.choice(['PL 01', '02'], rows),
+    })
+
+
+def _ytd(rng, rows, end):
+    # Două ani calendaristici, ca fișierul YTD folosit în comparațiile pe perioade
+    start = date(end.year - 1, 1, 1)
+    days = (end - start).days + 1
+    return pd.DataFrame({
+        'Data': _days(rng, rows, start, days),
+        'Valoare': np.round(rng.lognormal(4.5, 1.0, rows), 2),
+    })
+
+
+def generate_frames(sales_rows, seed=0, end=None):
+    """
+    Cadrele sintetice ale tuturor fișierelor din DATA_FILES, pentru
+    `sales_rows` rânduri de vânzări, cu ultima zi `end` (implicit azi).
+    """
+    if sales_rows > EXCEL_MAX_ROWS:
+        raise ValueError(f"O foaie Excel are cel mult {EXCEL_MAX_ROWS:,} rânduri de date")
+    end = end or date.today()
+    scale = sales_rows / BASE_ROWS['vanzari']
+    # Fișierele mai mari decât vânzările (ex. LaData) sunt limitate la o foaie
+    rows = {dataset: min(EXCEL_MAX_ROWS, max(1, round(base * scale))) for dataset, base in BASE_ROWS.items()}
+    rows['vanzari'] = sales_rows
+    days = min(MAX_DAYS, max(BASE_DAYS, round(BASE_DAYS * scale)))
+
+    rng = np.random.default_rng(seed)
+    catalog = _Catalog(rng, scale)
+    return {
+        'vanzari': _sales(rng, catalog, rows['vanzari'], end, days),
+        'balanta_la_data': _stock_at_date(rng, catalog, rows['balanta_la_data']),
+        'balanta_perioada': _stock_period(rng, catalog, rows['balanta_perioada']),
+        'neachitate': _payables(rng, catalog, rows['neachitate'], end),
+        'neincasate': _receivables(rng, catalog, rows['neincasate'], end),
+        'scadente_plati': _payment_instruments(rng, catalog, rows['scadente_plati'], end),
+        'cumparari_ciis': _receptions(rng, catalog, rows['cumparari_ciis'], end, min(days, 60)),
+        'cumparari_cipd': _purchase_documents(rng, catalog, rows['cumparari_cipd'], end, min(days, 60)),
+        'ytd': _ytd(rng, rows['ytd'], end),
+    }
+
+
+def write_workbook(df, path):
+    """
+    Scrie cadrul în prima foaie a unui fișier .xlsx, în modul write-only al
+    openpyxl (memorie constantă, indiferent de numărul de rânduri).
+    """
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = [None if pd.isna(value) else value.to_pydatetime() for value in series]
+        else:
+            values = series.astype(object).where(series.notna(), None).tolist()
+        columns.append(values)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([str(col) for col in df.columns])
+    for row in zip(*columns):
+        ws.append(row)
+    wb.save(path)
+
+
+def generate_data_dir(root, sales_rows, seed=0, end=None):
+    """
+    Scrie în `root` fișierele din DATA_FILES (aceleași căi relative, ex.
+    data/VS.xlsx) și returnează numărul de rânduri al fiecărui set de date.
+    """
+    frames = generate_frames(sales_rows, seed, end)
+    for dataset, df in frames.items():
+        path = os.path.join(root, DATA_FILES[dataset])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_workbook(df, path)
+    return {dataset: len(df) for dataset, df in frames.items()}
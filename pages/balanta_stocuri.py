@@ -4,32 +4,35 @@ Conține 2 subcategorii: La Dată și În Perioadă
 """
 
 import streamlit as st
-import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
-from utils.data_loaders import load_balanta_la_data, load_balanta_perioada
+from utils.data_loaders import (
+    load_balanta_la_data, load_balanta_perioada, load_indexes, load_hierarchy, load_kpis,
+    get_data_version, query_aggregate,
+)
+from utils.derived_cache import cached_derivation
+from utils.filters import FrameFilter
+from utils.helpers import cached_figure, hierarchy_chart_data, paginated_table
+from utils.timing import phase
 
 # ===== FUNCȚII HELPER PENTRU REUTILIZARE =====
 
-@st.cache_data
-def calculate_metrics(df, columns):
-    """Calculează metrici pentru coloanele specificate"""
+@cached_derivation
+def calculate_metrics(df, columns, data_version, filters=None):
+    """
+    Calculează metrici pentru coloanele specificate.
+    Cheia cache-ului este versiunea datelor + filtrele, nu conținutul DataFrame-ului.
+    """
     metrics = {}
     for col in columns:
         metrics[col] = df[col].sum() if col in df.columns else 0
     return metrics
 
-def safe_column_check(df, column):
-    """Verifică dacă coloana există și returnează valorile unice"""
-    return df[column].unique() if column in df.columns else []
-
-def apply_filters(df, filters_dict):
-    """Aplică multiple filtre pe DataFrame"""
-    filtered_df = df.copy()
+def apply_filters(df, filters_dict, columns=None, indexes=None):
+    """Aplică multiple filtre pe DataFrame, materializând doar felia finală"""
+    row_filter = FrameFilter(df, indexes)
     for column, values in filters_dict.items():
-        if column in df.columns and values:
-            filtered_df = filtered_df[filtered_df[column].isin(values)]
-    return filtered_df
+        row_filter.isin(column, values)
+    return row_filter.result(columns)
 
 def render_metrics_row(metrics_dict, format_str="{:,.0f} RON"):
     """Randează o linie de metrici"""
@@ -83,8 +86,16 @@ def filter_and_display_table(df, columns_to_show):
 st.markdown("### 📦 Balanță Stocuri")
 
 # Încărcare date o singură dată
+phase("încărcare")
 balanta_df = load_balanta_la_data()
 perioada_df = load_balanta_perioada()
+balanta_version = get_data_version('balanta_la_data')
+balanta_indexes = load_indexes(balanta_df)
+perioada_indexes = load_indexes(perioada_df)
+
+# Ierarhii precalculate per versiune de date - opțiunile filtrelor vin din ele, fără scanarea rândurilor
+balanta_hierarchy = load_hierarchy(balanta_df, ['DenumireGest', 'Producator', 'Denumire'])
+perioada_hierarchy = load_hierarchy(perioada_df, ['Denumire gestiune', 'Denumire', 'Furnizor IN', 'Producator'])
 
 # Definire coloane pentru afișarea restrânsă
 COLUMNS_TO_SHOW = ['DenumireGest', 'Denumire', 'UM', 'Pret', 'Stoc final', 'PretVanzare', 'Producator']
@@ -96,22 +107,23 @@ tab1, tab2, tab3 = st.tabs(["📅 În Dată", "📊 Perioadă", "🔍 Analize St
 with tab1:
     st.markdown("#### 📅 Balanță Stocuri la Dată")
     
-    # Calculare metrici principali
-    metrics_tab1 = calculate_metrics(balanta_df, ['ValoareVanzare', 'ValoareStocFinal'])
+    # Metrici principali, precalculați per versiune de date
+    balanta_kpis = load_kpis(balanta_df, 'balanta_la_data')
     
     # Afișare metrici
     render_metrics_row({
-        "Total Valoare Stoc Final": metrics_tab1['ValoareStocFinal'],
-        "Total Valoare Vânzare": metrics_tab1['ValoareVanzare']
+        "Total Valoare Stoc Final": balanta_kpis.total('ValoareStocFinal'),
+        "Total Valoare Vânzare": balanta_kpis.total('ValoareVanzare')
     })
     
     st.markdown("---")
     
     # FILTRARE INTERDEPENDENTĂ OPTIMIZATĂ - cu Producător în loc de Grupă
+    phase("La Dată: filtrare")
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        gestiune_options = safe_column_check(balanta_df, 'DenumireGest')
+        gestiune_options = balanta_hierarchy.distinct('DenumireGest')
         gestiune_filter = st.multiselect(
             "Filtrează după gestiune:",
             options=gestiune_options,
@@ -119,11 +131,9 @@ with tab1:
             key="gestiune_filter_tab1"
         )
     
-    # Filtrare progresivă pentru producător (în loc de grupă)
-    df_for_producator = apply_filters(balanta_df, {'DenumireGest': gestiune_filter})
-    
+    # Filtrare progresivă pentru producător (în loc de grupă) - din ierarhie
     with col2:
-        producator_options = safe_column_check(df_for_producator, 'Producator')
+        producator_options = balanta_hierarchy.options('Producator', {'DenumireGest': gestiune_filter})
         producator_filter = st.multiselect(
             "Filtrează după producător:",
             options=producator_options,
@@ -131,11 +141,11 @@ with tab1:
             key="producator_filter_tab1"
         )
     
-    # Filtrare progresivă pentru produs
-    df_for_produs = apply_filters(df_for_producator, {'Producator': producator_filter})
-    
+    # Filtrare progresivă pentru produs - din ierarhie
     with col3:
-        produs_options = safe_column_check(df_for_produs, 'Denumire')
+        produs_options = balanta_hierarchy.options(
+            'Denumire', {'DenumireGest': gestiune_filter, 'Producator': producator_filter}
+        )
         produs_filter = st.multiselect(
             "Filtrează după produs:",
             options=produs_options,
@@ -149,17 +159,19 @@ with tab1:
         'Producator': producator_filter,
         'Denumire': produs_filter
     }
-    filtered_balanta = apply_filters(balanta_df, filters_tab1)
+    filtered_balanta = apply_filters(balanta_df, filters_tab1, indexes=balanta_indexes)
     
     # Filtrare și afișare tabel cu coloane restrânse
+    phase("La Dată: tabel")
     st.markdown("#### 📋 Date Stocuri")
     table_data = filter_and_display_table(filtered_balanta, COLUMNS_TO_SHOW)
-    st.dataframe(table_data, use_container_width=True)
+    paginated_table(table_data, key="tabel_tab1", cache_key=(balanta_df.attrs.get('data_version'), filters_tab1))
     
     # Statistici filtrate
+    phase("La Dată: agregare")
     if not filtered_balanta.empty and any(filters_tab1.values()):
         st.markdown("#### 📊 Statistici Date Filtrate")
-        filtered_metrics = calculate_metrics(filtered_balanta, ['ValoareStocFinal', 'ValoareVanzare'])
+        filtered_metrics = calculate_metrics(filtered_balanta, ['ValoareStocFinal', 'ValoareVanzare'], balanta_version, filters_tab1)
         render_metrics_row({
             "Total Valoare Stoc Final Filtrată": filtered_metrics['ValoareStocFinal'],
             "Total Valoare Vânzare Filtrată": filtered_metrics['ValoareVanzare']
@@ -173,7 +185,7 @@ with tab1:
         st.markdown("#### 📊 Distribuția Stocului pe Gestiuni")
         
         stoc_pe_gestiune = (filtered_balanta
-                           .groupby('DenumireGest')['Stoc final']
+                           .groupby('DenumireGest', observed=True)['Stoc final']
                            .sum()
                            .reset_index())
         stoc_pe_gestiune = stoc_pe_gestiune[stoc_pe_gestiune['Stoc final'] > 0]
@@ -195,24 +207,19 @@ with tab1:
 with tab2:
     st.markdown("#### 📊 Balanță Stocuri pe Perioadă")
     
-    # Calculare metrici optimizat
-    valoare_intrare = perioada_df['Valoare intrare'].sum() if 'Valoare intrare' in perioada_df.columns else 0
-    
-    # Calculare preț vânzare optimizat
-    if all(col in perioada_df.columns for col in ['Stoc final', 'Pret vanzare']):
-        pret_vanzare = (perioada_df['Stoc final'] * perioada_df['Pret vanzare']).sum()
-    else:
-        pret_vanzare = 0
+    # Metrici principali, precalculați per versiune de date
+    perioada_kpis = load_kpis(perioada_df, 'balanta_perioada')
     
     # Afișare metrici
     render_metrics_row({
-        "Total Valoare Intrare": valoare_intrare,
-        "Total Preț Vânzare": pret_vanzare
+        "Total Valoare Intrare": perioada_kpis.total('Valoare intrare'),
+        "Total Preț Vânzare": perioada_kpis.total('ValoarePretVanzare')
     })
     
     st.markdown("---")
     
     # Filtre tab2 - toate în același loc
+    phase("Perioadă: filtrare")
     col1, col2, col3, col4 = st.columns(4)
     filter_configs = [
         (col1, 'Denumire gestiune', "gestiune"),
@@ -224,7 +231,7 @@ with tab2:
     filters_tab2 = {}
     for col_widget, column_name, filter_name in filter_configs:
         with col_widget:
-            options = safe_column_check(perioada_df, column_name)
+            options = perioada_hierarchy.distinct(column_name)
             filters_tab2[column_name] = st.multiselect(
                 f"Filtrează după {filter_name}:",
                 options=options,
@@ -233,17 +240,21 @@ with tab2:
             )
     
     # Aplicare filtre
-    filtered_perioada = apply_filters(perioada_df, filters_tab2)
+    filtered_perioada = apply_filters(perioada_df, filters_tab2, indexes=perioada_indexes)
     
     # Definire coloane pentru tab2 (perioada)
     COLUMNS_TO_SHOW_PERIOADA = ['Denumire gestiune', 'Denumire', 'UM', 'Pret vanzare', 'Stoc final', 'Valoare intrare', 'Producator']
     
     # Tabel cu date restrânse
+    phase("Perioadă: tabel")
     st.markdown("#### 📋 Date Perioada")
     table_data_perioada = filter_and_display_table(filtered_perioada, COLUMNS_TO_SHOW_PERIOADA)
-    st.dataframe(table_data_perioada, use_container_width=True)
+    paginated_table(
+        table_data_perioada, key="tabel_tab2", cache_key=(perioada_df.attrs.get('data_version'), filters_tab2)
+    )
     
     # Statistici filtrate
+    phase("Perioadă: agregare")
     if not filtered_perioada.empty:
         st.markdown("#### 📊 Statistici Date Filtrate")
         
@@ -267,90 +278,62 @@ with tab3:
     
     if not balanta_df.empty and all(col in balanta_df.columns for col in required_columns):
         
-        # Refolosim metricii calculați în tab1
+        # Refolosim metricii precalculați din tab1
         st.markdown("#### 📊 Totaluri Generale")
         render_metrics_row({
-            "Total Valoare Stoc Final": metrics_tab1['ValoareStocFinal'],
-            "Total Valoare Vânzare": metrics_tab1['ValoareVanzare']
+            "Total Valoare Stoc Final": balanta_kpis.total('ValoareStocFinal'),
+            "Total Valoare Vânzare": balanta_kpis.total('ValoareVanzare')
         })
         
         st.markdown("---")
         st.markdown("#### 🗂️ Vizualizare Treemap Ierarhic")
         
-        # Construire date treemap optimizat - cu Producator în loc de Grupa
-        producatori_data = (balanta_df
-                           .groupby(['DenumireGest', 'Producator'])
-                           .agg({'ValoareStocFinal': 'sum', 'ValoareVanzare': 'sum'})
-                           .reset_index())
-        
-        gestiuni_data = (balanta_df
-                        .groupby('DenumireGest')
-                        .agg({'ValoareStocFinal': 'sum', 'ValoareVanzare': 'sum'})
-                        .reset_index())
-        
-        # Construire date treemap
-        treemap_data = []
-        
-        # Producători
-        for _, row in producatori_data.iterrows():
-            treemap_data.append({
-                'ids': f"{row['DenumireGest']}-{row['Producator']}",
-                'labels': row['Producator'],
-                'parents': row['DenumireGest'],
-                'values': row['ValoareStocFinal'],
-                'vanzare': row['ValoareVanzare']
-            })
+        phase("Analize: grafice")
+        treemap_measures = ['ValoareStocFinal', 'ValoareVanzare']
+        gestiuni_data = query_aggregate(balanta_df, ['DenumireGest'], treemap_measures)
         
-        # Gestiuni
-        for _, row in gestiuni_data.iterrows():
-            treemap_data.append({
-                'ids': row['DenumireGest'],
-                'labels': row['DenumireGest'],
-                'parents': 'Brenado For House',
-                'values': row['ValoareStocFinal'],
-                'vanzare': row['ValoareVanzare']
-            })
-        
-        # Root
-        treemap_data.append({
-            'ids': 'Brenado For House',
-            'labels': 'Brenado For House',
-            'parents': '',
-            'values': metrics_tab1['ValoareStocFinal'],
-            'vanzare': metrics_tab1['ValoareVanzare']
-        })
-        
-        # Crearea și afișarea treemap
-        df_treemap = pd.DataFrame(treemap_data)
-        
-        fig = go.Figure(go.Treemap(
-            ids=df_treemap['ids'],
-            labels=df_treemap['labels'],
-            parents=df_treemap['parents'],
-            values=df_treemap['values'],
-            customdata=df_treemap['vanzare'],
-            branchvalues="total",
-            maxdepth=3,
-            textinfo="label+value",
-            texttemplate="<b>%{label}</b><br>Stoc: %{value:,.0f}<br>Vânzare: %{customdata:,.0f}",
-            hovertemplate='<b>%{label}</b><br>Stoc Final: %{value:,.0f} RON<br>Vânzare: %{customdata:,.0f} RON<extra></extra>',
-            textposition="middle center",
-            textfont_size=11,
-            marker_line_width=2,
-            marker_line_color="white"
-        ))
-        
-        fig.update_layout(
-            height=700,
-            title="Analiză Treemap: Brenado For House → Gestiuni → Producători",
-            title_x=0.5,
-            font_size=11,
-            margin=dict(t=60, l=10, r=10, b=10)
-        )
+        def build_treemap():
+            """Construire treemap optimizat - cu Producator în loc de Grupa"""
+            # Agregări executate în backend-ul SQL (vezi query_aggregate); vectorii
+            # ierarhiei se construiesc vectorizat (vezi utils/charts.py)
+            producatori_data = query_aggregate(
+                balanta_df, ['DenumireGest', 'Producator'], treemap_measures, dropna=False
+            )
+            treemap = hierarchy_chart_data(
+                producatori_data, ('DenumireGest', 'Producator'), 'ValoareStocFinal', ('ValoareVanzare',),
+                balanta_version, root='Brenado For House'
+            )
+
+            # Crearea treemap
+            fig = go.Figure(go.Treemap(
+                **treemap,
+                branchvalues="total",
+                maxdepth=3,
+                textinfo="label+value",
+                texttemplate="<b>%{label}</b><br>Stoc: %{value:,.0f}<br>Vânzare: %{customdata[0]:,.0f}",
+                hovertemplate='<b>%{label}</b><br>Stoc Final: %{value:,.0f} RON<br>Vânzare: %{customdata[0]:,.0f} RON<extra></extra>',
+                textposition="middle center",
+                textfont_size=11,
+                marker_line_width=2,
+                marker_line_color="white"
+            ))
+
+            fig.update_layout(
+                height=700,
+                title="Analiză Treemap: Brenado For House → Gestiuni → Producători",
+                title_x=0.5,
+                font_size=11,
+                margin=dict(t=60, l=10, r=10, b=10)
+            )
+            return fig
+
         
+        # Afișare treemap - figura vine din cache cât timp versiunea datelor nu se schimbă
+        fig = cached_figure('balanta_treemap', balanta_version, None, build_treemap)
         st.plotly_chart(fig, use_container_width=True)
         
         # Analiză detaliată optimizată
+        phase("Analize: tabel")
         st.markdown("#### 📊 Analiză Detaliată pe Gestiuni")
         
         # Formatare și sortare optimizată
@@ -1 +1,168 @@
+"""
+Pagina Cumpărări Intrări pentru aplicația Brenado For House
+Intrări în stoc (CIIS) și intrări pe documente (CIPD), din cuburi de agregate
+"""
 
+import streamlit as st
+import plotly.express as px
+from utils.data_loaders import load_cumparari_ciis, load_cumparari_cipd, load_cube, load_kpis
+from utils.helpers import paginated_table
+from utils.timing import phase
+
+# Titlu pagină
+st.markdown("### 🛒 Cumpărări Intrări")
+
+
+def render_purchases(df, dataset, group_column, key):
+    """
+    Conținutul unui tab de cumpărări: metrici, filtre, grafice și tabelul pe
+    produse. Totul se calculează din cubul furnizor × produs × zi (vezi
+    DATASET_CUBES), construit o singură dată per versiune de date, nu din
+    rândurile fișierului.
+    """
+    kpis = load_kpis(df, dataset)
+    cube = load_cube(df, dataset)
+
+    # Metrici principali, precalculați per versiune de date
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("💰 Valoare Totală", f"{kpis.total('Valoare'):,.0f} RON")
+    with col2:
+        st.metric("🏭 Furnizori", f"{kpis.distinct('Furnizor')}")
+    with col3:
+        st.metric("📦 Produse", f"{kpis.distinct('Denumire')}")
+    with col4:
+        st.metric("🧾 Documente", f"{kpis.distinct('Serie')}")
+
+    st.markdown("---")
+
+    first_day, last_day = cube.bounds()
+    if first_day is None:
+        st.info("Nu există intrări pentru acest set de date")
+        return
+
+    # Filtre - opțiunile vin din roll-up-urile cubului pe întreaga perioadă (fără valorile lipsă,
+    # care rămân totuși în totaluri cât timp dimensiunea nu este filtrată)
+    phase(f"{key}: filtrare")
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        date_range = st.date_input(
+            "📅 Interval date:",
+            value=(first_day.date(), last_day.date()),
+            min_value=first_day.date(),
+            max_value=last_day.date(),
+            format="DD/MM/YYYY",
+            key=f"{key}_interval"
+        )
+    with col2:
+        gestiuni = st.multiselect(
+            "Gestiune:", options=cube.rollup(['Gestiune'], ['Valoare'])['Gestiune'].dropna(), key=f"{key}_gestiune"
+        )
+    with col3:
+        grupe = st.multiselect(
+            "Grupă:", options=cube.rollup([group_column], ['Valoare'])[group_column].dropna(), key=f"{key}_grupa"
+        )
+    with col4:
+        furnizori = st.multiselect(
+            "Furnizor:", options=cube.rollup(['Furnizor'], ['Valoare'])['Furnizor'].dropna(), key=f"{key}_furnizor"
+        )
+
+    # În timpul selecției intervalul poate avea o singură zi
+    start_date = date_range[0] if len(date_range) > 0 else None
+    end_date = date_range[-1] if len(date_range) > 0 else None
+    filters = {'Gestiune': gestiuni, group_column: grupe, 'Furnizor': furnizori}
+
+    phase(f"{key}: agregare")
+    pe_furnizori = cube.rollup(['Furnizor'], None, start_date, end_date, filters)
+    if pe_furnizori.empty:
+        st.warning("Nu s-au găsit intrări cu filtrele selectate")
+        return
+
+    pe_produse = cube.rollup(['Denumire', 'UM', 'Furnizor'], None, start_date, end_date, filters)
+
+    # Metrici pe selecție
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Valoare Filtrată", f"{pe_furnizori['Valoare'].sum():,.0f} RON")
+    with col2:
+        st.metric("Furnizori", f"{pe_furnizori['Furnizor'].nunique()}")
+    with col3:
+        st.metric("Produse", f"{pe_produse['Denumire'].nunique()}")
+    with col4:
+        if 'Discount' in pe_furnizori.columns:
+            st.metric("Discount", f"{pe_furnizori['Discount'].sum():,.0f} RON")
+
+    # Grafice
+    phase(f"{key}: grafice")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("**Intrări pe Zi**")
+        daily = cube.rollup(['Data'], ['Valoare'], start_date, end_date, filters)
+        fig = px.line(daily, x='Data', y='Valoare', title="Evoluția Intrărilor", markers=True)
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        st.markdown("**Top 10 Furnizori**")
+        top_furnizori = pe_furnizori.nlargest(10, 'Valoare')
+        fig = px.bar(
+            top_furnizori,
+            x='Valoare',
+            y='Furnizor',
+            orientation='h',
+            title="Furnizori după Valoare",
+            color='Valoare',
+            color_continuous_scale='Blues'
+        )
+        fig.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
+        st.plotly_chart(fig, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("**Pe Grupe**")
+        pe_grupe = cube.rollup([group_column], ['Valoare'], start_date, end_date, filters)
+        fig = px.pie(pe_grupe, values='Valoare', names=group_column, title="Distribuția pe Grupe")
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        st.markdown("**Pe Gestiuni**")
+        pe_gestiuni = cube.rollup(['Gestiune'], ['Valoare'], start_date, end_date, filters)
+        fig = px.bar(pe_gestiuni, x='Gestiune', y='Valoare', title="Intrări pe Gestiuni", color='Gestiune')
+        fig.update_layout(height=400, showlegend=False)
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Tabel pe produse și furnizori, cu prețul mediu de intrare
+    phase(f"{key}: tabel")
+    st.markdown("#### 📋 Produse pe Furnizori")
+    # Roll-up-urile cubului sunt partajate - coloana nouă se adaugă pe o copie
+    pe_produse = pe_produse.assign(
+        PretMediu=(pe_produse['Valoare'] / pe_produse['Cantitate']).where(pe_produse['Cantitate'] != 0)
+    )
+    paginated_table(
+        pe_produse,
+        key=f"{key}_produse",
+        default_sort=('Valoare', False),
+        cache_key=(df.attrs.get('data_version'), (start_date, end_date, filters)),
+        column_config={
+            'Valoare': st.column_config.NumberColumn(format="%.2f RON"),
+            'PretMediu': st.column_config.NumberColumn("Preț Mediu", format="%.2f RON"),
+        }
+    )
+
+
+# Tabs pentru cele două surse de intrări
+tab1, tab2 = st.tabs(["📥 Intrări în Stoc (CIIS)", "🧾 Intrări pe Documente (CIPD)"])
+
+with tab1:
+    phase("ciis: încărcare")
+    render_purchases(load_cumparari_ciis(), 'cumparari_ciis', 'Denumire grupa', key="ciis")
+
+with tab2:
+    phase("cipd: încărcare")
+    render_purchases(load_cumparari_cipd(), 'cumparari_cipd', 'Grupa', key="cipd")
@@ -7,27 +7,28 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from utils.data_loaders import load_neachitate
+from utils.data_loaders import load_neachitate, load_indexes, load_aging, load_kpis, query_aggregate
+from utils.aging import assign_buckets
+from utils.derived_cache import cached_derivation
+from utils.filters import FrameFilter
+from utils.helpers import cached_figure, hierarchy_chart_data, render_aging
+from utils.timing import phase
 
 # Titlu pagină
 st.markdown("### ❌ Facturi Neachitate")
 
 # Încărcare date
+phase("încărcare")
 neachitate_df = load_neachitate()
 
-# Conversie DataScadenta la datetime
-if 'DataScadenta' in neachitate_df.columns:
-    neachitate_df['DataScadenta'] = pd.to_datetime(neachitate_df['DataScadenta'])
+# Metrici globali, precalculați per versiune de date
+data_curenta = datetime.now().date()
+neachitate_kpis = load_kpis(neachitate_df, 'neachitate')
+total_sold = neachitate_kpis.total('Sold')
+scadenta_azi = neachitate_kpis.on_day('Sold', data_curenta)
 
-# Calculare metrici globali
-total_sold = neachitate_df['Sold'].sum() if 'Sold' in neachitate_df.columns else 0
-
-# Calculare Scadenta Azi
-scadenta_azi = 0
-if 'DataScadenta' in neachitate_df.columns:
-    data_curenta = datetime.now().date()
-    facturi_azi = neachitate_df[neachitate_df['DataScadenta'].dt.date == data_curenta]
-    scadenta_azi = facturi_azi['Sold'].sum() if not facturi_azi.empty and 'Sold' in facturi_azi.columns else 0
+# Sume pe vechimea scadenței și furnizor, calculate o dată pe zi și versiune de date
+neachitate_aging = load_aging(neachitate_df, 'neachitate', data_curenta)
 
 # Metrici principale (doar cele originale)
 col1, col2 = st.columns(2)
@@ -40,6 +41,7 @@ with col2:
 st.markdown("---")
 
 # Filtre (doar cele originale)
+phase("filtrare")
 col1, col2 = st.columns(2)
 
 with col1:
@@ -61,12 +63,12 @@ with col2:
         key="scadenta_filter"
     )
 
-# Aplicare filtre
-filtered_df = neachitate_df.copy()
+# Aplicare filtre (fără copierea datelor)
+row_filter = FrameFilter(neachitate_df, load_indexes(neachitate_df))
 
 # Filtru furnizor
 if 'Furnizor' in neachitate_df.columns and furnizor_filter:
-    filtered_df = filtered_df[filtered_df['Furnizor'].isin(furnizor_filter)]
+    row_filter.isin('Furnizor', furnizor_filter)
 
 # Filtru scadențe
 if 'DataScadenta' in neachitate_df.columns and scadenta_filter != "Toate":
@@ -74,16 +76,13 @@ if 'DataScadenta' in neachitate_df.columns and scadenta_filter != "Toate":
     
     if scadenta_filter == "Azi":
         # Facturi care scad azi
-        filtered_df = filtered_df[filtered_df['DataScadenta'].dt.date == data_curenta]
+        row_filter.date_between('DataScadenta', data_curenta, data_curenta)
     
     elif scadenta_filter == "Săptămâna Curentă":
         # Începutul și sfârșitul săptămânii curente (luni - duminică)
         start_week = data_curenta - timedelta(days=data_curenta.weekday())
         end_week = start_week + timedelta(days=6)
-        filtered_df = filtered_df[
-            (filtered_df['DataScadenta'].dt.date >= start_week) & 
-            (filtered_df['DataScadenta'].dt.date <= end_week)
-        ]
+        row_filter.date_between('DataScadenta', start_week, end_week)
     
     elif scadenta_filter == "Luna Curentă":
         # Începutul și sfârșitul lunii curente
@@ -93,12 +92,12 @@ if 'DataScadenta' in neachitate_df.columns and scadenta_filter != "Toate":
         else:
             end_month = data_curenta.replace(month=data_curenta.month + 1, day=1) - timedelta(days=1)
         
-        filtered_df = filtered_df[
-            (filtered_df['DataScadenta'].dt.date >= start_month) & 
-            (filtered_df['DataScadenta'].dt.date <= end_month)
-        ]
+        row_filter.date_between('DataScadenta', start_month, end_month)
+
+filtered_df = row_filter.result()
 
 # Afișare tabel cu datele filtrate
+phase("tabel")
 st.dataframe(filtered_df, use_container_width=True)
 
 # Metrici pentru datele filtrate (sub tabel)
@@ -109,80 +108,76 @@ if not filtered_df.empty:
 
 st.markdown("---")
 
+# ===== VECHIME SOLD =====
+phase("vechime")
+st.markdown("### ⏳ Vechime Sold")
+render_aging(
+    neachitate_aging, 'Furnizor', 'Sold', key="vechime_neachitate",
+    selected=furnizor_filter if 'Furnizor' in neachitate_df.columns else None
+)
+
+st.markdown("---")
+
 # ===== GRAFIC PLĂȚI CU EFECTE (PERMANENT) =====
+phase("grafice")
+# Intervalele graficului: (categorie, prima zi trecută de la scadență)
+CATEGORII_SCADENTA = [('Scadență Viitoare', None), ('Azi', 0), ('Scadență Depășită', 1)]
+
 st.markdown("### 💳 Plăți Cu Efecte")
 
-# Filtrare doar facturile cu AchitatEfecte > 0
-df_efecte = neachitate_df[neachitate_df['AchitatEfecte'] > 0].copy()
+sume_efecte = ['Total', 'Sold', 'AchitatEfecte']
+
+
+@cached_derivation
+def efecte_pe_scadenta(df, data_version, data_curenta):
+    """
+    Sume pe scadență și furnizor doar pentru facturile cu AchitatEfecte > 0,
+    agregate în backend-ul SQL și categorisite după scadență, o singură dată
+    per versiune de date și zi; mai departe se lucrează doar cu grupurile
+    """
+    if not all(col in df.columns for col in sume_efecte + ['DataScadenta', 'Furnizor']):
+        return pd.DataFrame()
+    df_efecte = query_aggregate(
+        df, ['DataScadenta', 'Furnizor'], sume_efecte,
+        filters=[('AchitatEfecte', '>', 0)], dropna=False, count='Facturi'
+    )
+    # Categorizare după scadență (vectorizată, cu intervale proprii graficului)
+    df_efecte['Categoria'] = assign_buckets(df_efecte['DataScadenta'], data_curenta, CATEGORII_SCADENTA)
+    return df_efecte
+
+
+neachitate_version = neachitate_df.attrs.get('data_version')
+df_efecte = efecte_pe_scadenta(neachitate_df, neachitate_version, data_curenta)
 
 if not df_efecte.empty:
-    # Categorizare după scadență
-    data_curenta = datetime.now().date()
-    
-    def get_categoria_scadenta(data_scadenta):
-        if pd.isna(data_scadenta):
-            return "Necunoscută"
-        if data_scadenta.date() == data_curenta:
-            return "Azi"
-        elif data_scadenta.date() > data_curenta:
-            return "Scadență Viitoare"
-        else:
-            return "Scadență Depășită"
-    
-    df_efecte['Categoria'] = df_efecte['DataScadenta'].apply(get_categoria_scadenta)
-    
-    # Construire date pentru Sunburst
-    # Nivel 1: Root
     total_efecte = df_efecte['Total'].sum()
     
-    # Nivel 2: Categorii (Azi, Scadență Viitoare, Scadență Depășită) - toate sumele
-    categorii_sume = df_efecte.groupby('Categoria')[['Total', 'Sold', 'AchitatEfecte']].sum()
-    
-    # Nivel 3: Furnizori pe fiecare categorie - toate sumele
-    furnizori_categorii = df_efecte.groupby(['Categoria', 'Furnizor'])[['Total', 'Sold', 'AchitatEfecte']].sum()
-    
-    # Calcul sume totale pentru root
-    total_efecte = df_efecte['Total'].sum()
-    total_sold = df_efecte['Sold'].sum()
-    total_achitat_efecte = df_efecte['AchitatEfecte'].sum()
-    
-    # Construire liste pentru Sunburst
-    ids = ['PLATI_CU_EFECTE']
-    labels = [f'PLĂȚI CU EFECTE<br>Total: {total_efecte:,.0f}<br>Sold: {total_sold:,.0f}<br>Efecte: {total_achitat_efecte:,.0f}']  
-    parents = ['']
-    values = [total_efecte]
-    
-    # Adaugă categoriile
-    for categoria, row in categorii_sume.iterrows():
-        ids.append(f'CAT_{categoria}')
-        labels.append(f'{categoria}<br>Total: {row["Total"]:,.0f}<br>Sold: {row["Sold"]:,.0f}<br>Efecte: {row["AchitatEfecte"]:,.0f}')
-        parents.append('PLATI_CU_EFECTE')
-        values.append(row['Total'])
-    
-    # Adaugă furnizorii
-    for (categoria, furnizor), row in furnizori_categorii.iterrows():
-        ids.append(f'CAT_{categoria}_FURN_{furnizor}')
-        labels.append(f'{furnizor}<br>Total: {row["Total"]:,.0f}<br>Sold: {row["Sold"]:,.0f}<br>Efecte: {row["AchitatEfecte"]:,.0f}')
-        parents.append(f'CAT_{categoria}')
-        values.append(row['Total'])
-    
-    # Creare Sunburst Chart
-    fig = go.Figure(go.Sunburst(
-        ids=ids,
-        labels=labels,
-        parents=parents,
-        values=values,
-        branchvalues="total",
-        maxdepth=3,
-        hovertemplate='<b>%{label}</b><br>Suma: %{value:,.0f} RON<extra></extra>'
-    ))
-    
-    fig.update_layout(
-        title="📊 Distribuția Plăților Cu Efecte",
-        height=500,
-        font_size=12
-    )
+    def build_sunburst():
+        """Sunburst: rădăcină -> categorii de scadență -> furnizori"""
+        # Sumele sunt formatate de Plotly din customdata (Sold, AchitatEfecte)
+        sunburst = hierarchy_chart_data(
+            df_efecte, ('Categoria', 'Furnizor'), 'Total', ('Sold', 'AchitatEfecte'),
+            neachitate_version, filters={'data': str(data_curenta)},
+            root='PLĂȚI CU EFECTE'
+        )
+        
+        fig = go.Figure(go.Sunburst(
+            **sunburst,
+            branchvalues="total",
+            maxdepth=3,
+            texttemplate='%{label}<br>Total: %{value:,.0f}<br>Sold: %{customdata[0]:,.0f}<br>Efecte: %{customdata[1]:,.0f}',
+            hovertemplate='<b>%{label}</b><br>Suma: %{value:,.0f} RON<br>Sold: %{customdata[0]:,.0f} RON<br>Efecte: %{customdata[1]:,.0f} RON<extra></extra>'
+        ))
+        
+        fig.update_layout(
+            title="📊 Distribuția Plăților Cu Efecte",
+            height=500,
+            font_size=12
+        )
+        return fig
     
+    # Creare Sunburst Chart - din cache-ul de figuri pentru aceeași versiune de date și zi
+    fig = cached_figure('neachitate_sunburst', neachitate_version, {'data': data_curenta}, build_sunburst)
     st.plotly_chart(fig, use_container_width=True)
     
     # Afișare statistici
@@ -190,7 +185,7 @@ if not df_efecte.empty:
     with col1:
         st.metric("Total Efecte", f"{total_efecte:,.0f} RON")
     with col2:
-        st.metric("Facturi", f"{len(df_efecte)}")
+        st.metric("Facturi", f"{df_efecte['Facturi'].sum()}")
 
 else:
     st.info("Nu există facturi cu Plăți Cu Efecte (AchitatEfecte > 0)")
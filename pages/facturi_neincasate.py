@@ -3,18 +3,24 @@ Pagina Facturi Neîncasate pentru aplicația Brenado For House
 """
 
 import streamlit as st
-from utils.data_loaders import load_neincasate
+from datetime import datetime
+from utils.data_loaders import load_neincasate, load_indexes, load_aging, load_kpis
+from utils.filters import FrameFilter
+from utils.helpers import render_aging
+from utils.timing import phase
 
 # Titlu pagină
 st.markdown("### 📥 Facturi Neîncasate")
 
 # Încărcare date
+phase("încărcare")
 neincasate_df = load_neincasate()
 
-# Calculare metrici principali
-total_general = neincasate_df['Total'].sum() if 'Total' in neincasate_df.columns else 0
-total_sold = neincasate_df['Sold'].sum() if 'Sold' in neincasate_df.columns else 0
-total_achitat = neincasate_df['Achitat'].sum() if 'Achitat' in neincasate_df.columns else 0
+# Metrici principali, precalculați per versiune de date
+neincasate_kpis = load_kpis(neincasate_df, 'neincasate')
+total_general = neincasate_kpis.total('Total')
+total_sold = neincasate_kpis.total('Sold')
+total_achitat = neincasate_kpis.total('Achitat')
 
 # Metrici principale
 col1, col2, col3 = st.columns(3)
@@ -29,6 +35,7 @@ with col3:
 st.markdown("---")
 
 # Filtre
+phase("filtrare")
 col1, col2 = st.columns(2)
 
 with col1:
@@ -51,18 +58,21 @@ with col2:
             key="agent_filter"
         )
 
-# Aplicare filtre
-filtered_df = neincasate_df.copy()
+# Aplicare filtre (fără copierea datelor)
+row_filter = FrameFilter(neincasate_df, load_indexes(neincasate_df))
 
 # Filtru client
 if 'Client' in neincasate_df.columns and client_filter:
-    filtered_df = filtered_df[filtered_df['Client'].isin(client_filter)]
+    row_filter.isin('Client', client_filter)
 
 # Filtru agent
 if 'Agent' in neincasate_df.columns and agent_filter:
-    filtered_df = filtered_df[filtered_df['Agent'].isin(agent_filter)]
+    row_filter.isin('Agent', agent_filter)
+
+filtered_df = row_filter.result()
 
 # Afișare tabel cu datele filtrate
+phase("tabel")
 st.dataframe(filtered_df, use_container_width=True)
 
 # Metrici pentru datele filtrate (sub tabel)
@@ -79,3 +89,14 @@ if not filtered_df.empty and (client_filter or agent_filter):
     with col3:
         achitat_filtrat = filtered_df['Achitat'].sum() if 'Achitat' in filtered_df.columns else 0
         st.metric("Achitat Filtrat", f"{achitat_filtrat:,.0f} RON")
+
+st.markdown("---")
+
+# ===== VECHIME SOLD (pe intervale de scadență și client) =====
+phase("vechime")
+st.markdown("### ⏳ Vechime Sold")
+neincasate_aging = load_aging(neincasate_df, 'neincasate', datetime.now().date())
+render_aging(
+    neincasate_aging, 'Client', 'Sold', key="vechime_neincasate",
+    selected=client_filter if 'Client' in neincasate_df.columns else None
+)
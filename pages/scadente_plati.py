@@ -3,22 +3,22 @@ Pagina Scadențe Plăți Cu Efecte pentru aplicația Brenado For House
 """
 
 import streamlit as st
-import pandas as pd
-from utils.data_loaders import load_scadente_plati
+import numpy as np
+from datetime import datetime
+from utils.data_loaders import load_scadente_plati, load_indexes, load_aging, load_kpis
+from utils.filters import FrameFilter
+from utils.helpers import render_aging
+from utils.timing import phase
 
 # Titlu pagină
 st.markdown("### ⏰ Scadențe Plăți Cu Efecte")
 
 # Încărcare date
+phase("încărcare")
 scadente_df = load_scadente_plati()
 
-# Formatare date - convertire la datetime și extragere doar data (format YYYY-MM-DD)
-if 'DataScadenta' in scadente_df.columns:
-    scadente_df['DataScadenta'] = pd.to_datetime(scadente_df['DataScadenta'])
-    scadente_df['DataScadenta_Formatata'] = scadente_df['DataScadenta'].dt.strftime('%Y-%m-%d')
-
-# Calculare metrici principali
-suma_totala = scadente_df['Suma'].sum() if 'Suma' in scadente_df.columns else 0
+# Metrici principali, precalculați per versiune de date
+suma_totala = load_kpis(scadente_df, 'scadente_plati').total('Suma')
 
 # Metrici principali
 st.metric("Suma", f"{suma_totala:,.2f} RON")
@@ -26,14 +26,18 @@ st.metric("Suma", f"{suma_totala:,.2f} RON")
 st.markdown("---")
 
 # Filtre
+phase("filtrare")
 col1, col2 = st.columns(2)
 
 with col1:
-    # Filtru data scadenta (folosind datele formatate)
-    if 'DataScadenta_Formatata' in scadente_df.columns:
+    # Filtru data scadenta (zilele distincte, afișate YYYY-MM-DD)
+    if 'DataScadenta' in scadente_df.columns:
+        # datetime.date, nu datetime64: altfel Streamlit le afișează ca "2025-07-21 00:00:00"
+        zile_scadenta = np.unique(scadente_df['DataScadenta'].dropna().to_numpy().astype('datetime64[D]')).tolist()
         data_scadenta_filter = st.multiselect(
             "Filtrează după data scadența:",
-            options=sorted(scadente_df['DataScadenta_Formatata'].unique()),
+            options=zile_scadenta,
+            format_func=lambda d: d.strftime('%Y-%m-%d'),
             default=[],
             key="data_scadenta_filter"
         )
@@ -48,27 +52,36 @@ with col2:
             key="tert_filter"
         )
 
-# Aplicare filtre
-filtered_df = scadente_df.copy()
+# Aplicare filtre (fără copierea datelor și fără coloane helper în datele din cache)
+row_filter = FrameFilter(scadente_df, load_indexes(scadente_df))
 
 # Filtru data scadenta
-if 'DataScadenta_Formatata' in scadente_df.columns and data_scadenta_filter:
-    filtered_df = filtered_df[filtered_df['DataScadenta_Formatata'].isin(data_scadenta_filter)]
+if 'DataScadenta' in scadente_df.columns and data_scadenta_filter:
+    row_filter.days_in('DataScadenta', data_scadenta_filter)
 
 # Filtru tert
 if 'Tert' in scadente_df.columns and tert_filter:
-    filtered_df = filtered_df[filtered_df['Tert'].isin(tert_filter)]
+    row_filter.isin('Tert', tert_filter)
 
-# Afișare tabel cu datele filtrate (fără coloana helper)
-if 'DataScadenta_Formatata' in filtered_df.columns:
-    display_df = filtered_df.drop(columns=['DataScadenta_Formatata'])
-else:
-    display_df = filtered_df
+filtered_df = row_filter.result()
 
-st.dataframe(display_df, use_container_width=True)
+# Afișare tabel cu datele filtrate
+phase("tabel")
+st.dataframe(filtered_df, use_container_width=True)
 
 # Metrici pentru datele filtrate (sub tabel)
 if not filtered_df.empty and (data_scadenta_filter or tert_filter):
     st.markdown("#### 📊 Statistici Date Filtrate")
     suma_filtrata = filtered_df['Suma'].sum() if 'Suma' in filtered_df.columns else 0
     st.metric("Suma Filtrată", f"{suma_filtrata:,.2f} RON")
+
+st.markdown("---")
+
+# ===== VECHIME EFECTE (pe intervale de scadență și terț) =====
+phase("vechime")
+st.markdown("### ⏳ Vechime Efecte")
+scadente_aging = load_aging(scadente_df, 'scadente_plati', datetime.now().date())
+render_aging(
+    scadente_aging, 'Tert', 'Suma', key="vechime_scadente",
+    selected=tert_filter if 'Tert' in scadente_df.columns else None
+)
@@ -6,21 +6,29 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
-from utils.data_loaders import load_vanzari
-import calendar
+from utils.data_loaders import load_vanzari, load_indexes, load_cube, load_kpis, load_dataset, get_data_version
+from utils.derived_cache import cached_derivation
+from utils.filters import FrameFilter
+from utils.helpers import cached_figure, paginated_table
+from utils.periods import ALIGN_DAY, ALIGN_WEEKDAY, compare_periods, daily_series, period_bounds, period_summary
+from utils.timing import phase
 import plotly.graph_objects as go
 
 # Titlu pagină
 st.markdown("### 📊 Vânzări")
 
 # Încărcare date
+phase("încărcare")
 vanzari_df = load_vanzari()
+vanzari_indexes = load_indexes(vanzari_df)
+vanzari_cube = load_cube(vanzari_df, 'vanzari')
 
-# Calculare metrici principali
-total_vanzari = vanzari_df['Valoare'].sum() if 'Valoare' in vanzari_df.columns else 0
-clienti_unici = vanzari_df['Client'].nunique() if 'Client' in vanzari_df.columns else 0
-total_records = len(vanzari_df)
-gestiuni = vanzari_df['DenumireGestiune'].nunique() if 'DenumireGestiune' in vanzari_df.columns else 0
+# Metrici principali, precalculați per versiune de date
+vanzari_kpis = load_kpis(vanzari_df, 'vanzari')
+total_vanzari = vanzari_kpis.total('Valoare')
+clienti_unici = vanzari_kpis.distinct('Client')
+total_records = vanzari_kpis.rows
+gestiuni = vanzari_kpis.distinct('DenumireGestiune')
 
 # Metrici principale
 col1, col2, col3, col4 = st.columns(4)
@@ -37,6 +45,7 @@ with col4:
 st.markdown("---")
 
 # Grafice
+phase("grafice")
 st.subheader("📈 Analize Vizuale")
 
 col1, col2 = st.columns(2)
@@ -44,8 +53,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown("**Vânzări pe Zi**")
     if 'Data' in vanzari_df.columns and 'Valoare' in vanzari_df.columns:
-        daily_sales = vanzari_df.groupby(vanzari_df['Data'].dt.date)['Valoare'].sum().reset_index()
-        daily_sales.columns = ['Data', 'Valoare']
+        daily_sales = vanzari_cube.rollup(['Data'], ['Valoare'])
         
         if not daily_sales.empty:
             fig = px.line(
@@ -65,7 +73,7 @@ with col1:
 with col2:
     st.markdown("**Top 10 Clienți**")
     if 'Client' in vanzari_df.columns and 'Valoare' in vanzari_df.columns:
-        top_clienti = vanzari_df.groupby('Client')['Valoare'].sum().nlargest(10).reset_index()
+        top_clienti = vanzari_cube.rollup(['Client'], ['Valoare']).nlargest(10, 'Valoare')
         
         if not top_clienti.empty:
             fig = px.bar(
@@ -89,9 +97,32 @@ st.markdown("---")
 # ===== TABS PENTRU DATE DETALIATE ȘI ANALIZE =====
 tab1, tab2 = st.tabs(["📋 Date Detaliate", "📊 Analize Avansate"])
 
+def date_interval_input(key=None):
+    """
+    Selector de interval pe coloana Data, implicit ziua curentă (limitată la
+    datele disponibile). Limitele vin din indexul sortat, fără scanarea coloanei.
+    """
+    if 'Data' in vanzari_indexes:
+        min_date, max_date = vanzari_indexes['Data'].bounds()
+    else:
+        min_date, max_date = vanzari_df['Data'].min(), vanzari_df['Data'].max()
+    min_date, max_date = min_date.date(), max_date.date()
+    default_date = min(max(datetime.now().date(), min_date), max_date)
+
+    return st.date_input(
+        "📅 Interval date:",
+        value=(default_date, default_date),
+        min_value=min_date,
+        max_value=max_date,
+        format="DD/MM/YYYY",
+        key=key
+    )
+
+
 # ===== TAB 1: DATE DETALIATE (CODUL ACTUAL) =====
 with tab1:
     # Date detaliate cu filtre
+    phase("filtrare")
     st.subheader("📋 Date Detaliate")
 
     # Radio buttons pentru tipul de afișare
@@ -118,25 +149,7 @@ with tab1:
 
         with col3:
             if 'Data' in vanzari_df.columns:
-                vanzari_df['Data'] = pd.to_datetime(vanzari_df['Data'])
-                min_date = vanzari_df['Data'].min().date()
-                max_date = vanzari_df['Data'].max().date()
-                today = datetime.now().date()
-                
-                if today > max_date:
-                    default_date = max_date
-                elif today < min_date:
-                    default_date = min_date
-                else:
-                    default_date = today
-                
-                date_range = st.date_input(
-                    "📅 Interval date:",
-                    value=(default_date, default_date),
-                    min_value=min_date,
-                    max_value=max_date,
-                    format="DD/MM/YYYY"
-                )
+                date_range = date_interval_input()
 
         with col4:
             # Filtru produs
@@ -148,84 +161,56 @@ with tab1:
                     key="produs_filter"
                 )
 
-        # Aplicare filtre pentru Standard
-        filtered_df = vanzari_df.copy()
+        # Aplicare filtre pentru Standard (fără copierea datelor)
+        row_filter = FrameFilter(vanzari_df, vanzari_indexes)
+        # Filtrele aplicate, pentru cheia ordinii memorate a tabelului
+        table_filters = {}
 
         # Filtru gestiune
         if 'DenumireGestiune' in vanzari_df.columns and selected_gestiune != 'Toate':
-            filtered_df = filtered_df[filtered_df['DenumireGestiune'] == selected_gestiune]
+            row_filter.equals('DenumireGestiune', selected_gestiune)
+            table_filters['DenumireGestiune'] = selected_gestiune
 
         # Filtru agent
         if 'Agent' in vanzari_df.columns and selected_agent != 'Toți':
-            filtered_df = filtered_df[filtered_df['Agent'] == selected_agent]
-
-        # Filtru dată
-        if 'Data' in vanzari_df.columns and date_range:
-            if isinstance(date_range, tuple) and len(date_range) == 2:
-                start_date, end_date = date_range
-                filtered_df = filtered_df[
-                    (filtered_df['Data'].dt.date >= start_date) & 
-                    (filtered_df['Data'].dt.date <= end_date)
-                ]
-            else:
-                selected_date_obj = date_range
-                filtered_df = filtered_df[filtered_df['Data'].dt.date == selected_date_obj]
+            row_filter.equals('Agent', selected_agent)
+            table_filters['Agent'] = selected_agent
 
         # Filtru produs
         if 'Denumire' in vanzari_df.columns and produs_filter:
-            filtered_df = filtered_df[filtered_df['Denumire'].isin(produs_filter)]
+            row_filter.isin('Denumire', produs_filter)
+            table_filters['Denumire'] = produs_filter
 
     else:
         # Pentru "Zi și Clienți" și "Top Produse" - doar filtru dată
         if 'Data' in vanzari_df.columns:
-            vanzari_df['Data'] = pd.to_datetime(vanzari_df['Data'])
-            min_date = vanzari_df['Data'].min().date()
-            max_date = vanzari_df['Data'].max().date()
-            today = datetime.now().date()
-            
-            if today > max_date:
-                default_date = max_date
-            elif today < min_date:
-                default_date = min_date
-            else:
-                default_date = today
-            
-            date_range = st.date_input(
-                "📅 Interval date:",
-                value=(default_date, default_date),
-                min_value=min_date,
-                max_value=max_date,
-                format="DD/MM/YYYY",
-                key=f"date_filter_{view_type}"
-            )
+            date_range = date_interval_input(key=f"date_filter_{view_type}")
         
-        # Aplicare filtru dată pentru toate view-urile
-        filtered_df = vanzari_df.copy()
-        if 'Data' in vanzari_df.columns and date_range:
-            if isinstance(date_range, tuple) and len(date_range) == 2:
-                start_date, end_date = date_range
-                filtered_df = filtered_df[
-                    (filtered_df['Data'].dt.date >= start_date) & 
-                    (filtered_df['Data'].dt.date <= end_date)
-                ]
-            else:
-                selected_date_obj = date_range
-                filtered_df = filtered_df[filtered_df['Data'].dt.date == selected_date_obj]
+        row_filter = FrameFilter(vanzari_df, vanzari_indexes)
+        table_filters = {}
+
+    # Filtru dată - comun tuturor view-urilor
+    start_date = end_date = None
+    if 'Data' in vanzari_df.columns and date_range:
+        if isinstance(date_range, tuple):
+            start_date, end_date = date_range[0], date_range[-1]
+        else:
+            start_date = end_date = date_range
+        row_filter.date_between('Data', start_date, end_date)
+        table_filters['Data'] = (start_date, end_date)
 
     # Procesare date în funcție de tipul de view selectat
+    phase("agregare")
     if view_type == "Standard":
         # Afișare standard - toate coloanele
-        display_df = filtered_df.copy()
-        if 'Data' in display_df.columns:
-            display_df = display_df.sort_values('Data', ascending=False)
+        # Sortarea descrescătoare după dată se face pe server, doar pentru pagina afișată
+        display_df = row_filter.result()
         
     elif view_type == "Zi și Clienți":
         # Grupare pe Data și Client
-        if all(col in filtered_df.columns for col in ['Data', 'Client', 'Valoare', 'Adaos']):
-            display_df = filtered_df.groupby(['Data', 'Client']).agg({
-                'Valoare': 'sum',
-                'Adaos': 'sum'
-            }).reset_index()
+        if all(col in vanzari_df.columns for col in ['Data', 'Client', 'Valoare', 'Adaos']):
+            # Roll-up din cubul de agregate (doar filtrul de dată se aplică aici)
+            display_df = vanzari_cube.rollup(['Data', 'Client'], ['Valoare', 'Adaos'], start_date, end_date)
             display_df = display_df.sort_values('Data', ascending=False)
         else:
             st.warning("Coloanele necesare (Data, Client, Valoare, Adaos) nu sunt disponibile")
@@ -234,15 +219,16 @@ with tab1:
     elif view_type == "Top Produse":
         # Afișare doar coloanele specificate
         required_columns = ['Denumire', 'Cantitate', 'Valoare', 'Adaos']
-        available_columns = [col for col in required_columns if col in filtered_df.columns]
+        available_columns = [col for col in required_columns if col in vanzari_df.columns]
         
         if available_columns:
-            display_df = filtered_df[available_columns].copy()
+            display_df = row_filter.result(available_columns)
         else:
             st.warning("Coloanele necesare (Denumire, Cantitate, Valoare, Adaos) nu sunt disponibile")
             display_df = pd.DataFrame()
 
     # Afișare rezultate
+    phase("tabel")
     if not display_df.empty:
         # Configurare column_config în funcție de view type
         if view_type == "Standard" and 'Data' in display_df.columns:
@@ -262,12 +248,15 @@ with tab1:
         else:
             column_config = None
         
-        # Afișare DataFrame
-        st.dataframe(
-            display_df, 
-            use_container_width=True, 
+        # Afișare paginată - browserului i se trimite doar pagina curentă
+        default_sort = ('Data', False) if view_type == "Standard" and 'Data' in display_df.columns else None
+        paginated_table(
+            display_df,
+            key=f"tabel_{view_type}",
+            default_sort=default_sort,
+            column_config=column_config,
             height=400,
-            column_config=column_config
+            cache_key=(vanzari_df.attrs.get('data_version'), table_filters)
         )
         
         # Afișez statisticile
@@ -294,212 +283,263 @@ with tab2:
     st.subheader("📊 Analize Avansate")
     
     # Încărcare date YTD
-    @st.cache_data
     def load_ytd_data():
-        """Încarcă datele YTD din Excel"""
+        """Încarcă datele YTD din depozitul partajat de seturi de date (o parsare per versiune)"""
         try:
-            df = pd.read_excel("data/YTD.xlsx")
-            if 'Data' in df.columns:
-                df['Data'] = pd.to_datetime(df['Data'])
-            return df
+            return load_dataset('ytd')
         except Exception as e:
             st.warning(f"Nu s-au putut încărca datele YTD din fișier. Se folosesc date demo pentru testare.")
+            return load_demo_ytd_data()
+    
+    @st.cache_data
+    def load_demo_ytd_data():
+        """Date YTD demo, generate o singură dată"""
+        # Date demo pentru testare - FĂRĂ numpy
+        import random
+        from datetime import timedelta
+        
+        demo_data = []
+        
+        # Date pentru 2024 (iunie-decembrie)
+        start_date_2024 = datetime(2024, 6, 1)
+        end_date_2024 = datetime(2024, 12, 31)
+        current_date = start_date_2024
+        base_value = 800
+        
+        while current_date <= end_date_2024:
+            daily_value = base_value + random.randint(200, 1200)
+            demo_data.append({'Data': current_date, 'Valoare': daily_value})
+            current_date += timedelta(days=1)
+            base_value += random.randint(-50, 50)  # variație ușoară
+        
+        # Date pentru 2025 (ianuarie-iulie)
+        start_date_2025 = datetime(2025, 1, 1)
+        end_date_2025 = datetime(2025, 7, 26)
+        current_date = start_date_2025
+        base_value = 1000
+        
+        while current_date <= end_date_2025:
+            daily_value = base_value + random.randint(300, 1500)
+            demo_data.append({'Data': current_date, 'Valoare': daily_value})
+            current_date += timedelta(days=1)
+            base_value += random.randint(-60, 60)
             
-            # Date demo pentru testare - FĂRĂ numpy
-            import random
-            from datetime import timedelta
-            
-            demo_data = []
-            
-            # Date pentru 2024 (iunie-decembrie)
-            start_date_2024 = datetime(2024, 6, 1)
-            end_date_2024 = datetime(2024, 12, 31)
-            current_date = start_date_2024
-            base_value = 800
-            
-            while current_date <= end_date_2024:
-                daily_value = base_value + random.randint(200, 1200)
-                demo_data.append({'Data': current_date, 'Valoare': daily_value})
-                current_date += timedelta(days=1)
-                base_value += random.randint(-50, 50)  # variație ușoară
-            
-            # Date pentru 2025 (ianuarie-iulie)
-            start_date_2025 = datetime(2025, 1, 1)
-            end_date_2025 = datetime(2025, 7, 26)
-            current_date = start_date_2025
-            base_value = 1000
-            
-            while current_date <= end_date_2025:
-                daily_value = base_value + random.randint(300, 1500)
-                demo_data.append({'Data': current_date, 'Valoare': daily_value})
-                current_date += timedelta(days=1)
-                base_value += random.randint(-60, 60)
-                
-            return pd.DataFrame(demo_data)
+        return pd.DataFrame(demo_data)
+    
+    @cached_derivation
+    def ytd_daily_sales(df, data_version):
+        """Vânzările YTD pe zile, agregate o singură dată per versiune de date"""
+        return daily_series(df, 'Data', 'Valoare')
     
+    @cached_derivation
+    def ytd_period_comparison(daily, data_version, start, end, years, align):
+        """Punctele și statisticile perioadelor comparate, din seria zilnică (vezi utils/periods.py)"""
+        comparison = compare_periods(daily, start, end, years, align)
+        return comparison, period_summary(comparison, start, end, years, align)
+    
+    # Perioadele și alinierile oferite în comparație
+    COMPARISON_PERIODS = {
+        "Săptămâna curentă": 'week',
+        "Luna curentă": 'month',
+        "Trimestrul curent": 'quarter',
+        "Anul până azi (YTD)": 'ytd',
+        "Interval personalizat": 'custom',
+    }
+    COMPARISON_ALIGN = {
+        "Ziua din perioadă": ALIGN_DAY,
+        "Ziua săptămânii": ALIGN_WEEKDAY,
+    }
+    COMPARISON_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
+    
+    phase("încărcare YTD")
+    ytd_version = get_data_version('ytd')
     ytd_df = load_ytd_data()
     
     if not ytd_df.empty and 'Data' in ytd_df.columns and 'Valoare' in ytd_df.columns:
-        # Afișez informații despre datele încărcate
-        st.info(f"📅 Date disponibile: {ytd_df['Data'].min().strftime('%d/%m/%Y')} - {ytd_df['Data'].max().strftime('%d/%m/%Y')}")
+        # Seria zilnică se agregă o singură dată per versiune de date; schimbarea
+        # perioadei comparate doar feliază seria
+        daily_sales_ytd = ytd_daily_sales(ytd_df, ytd_version)
+        first_day, last_day = daily_sales_ytd.index.min(), daily_sales_ytd.index.max()
         
-        # Grupare vânzări pe zi
-        daily_sales_ytd = ytd_df.groupby(ytd_df['Data'].dt.date)['Valoare'].sum().reset_index()
-        daily_sales_ytd.columns = ['Data', 'Valoare']
-        daily_sales_ytd['Data'] = pd.to_datetime(daily_sales_ytd['Data'])
+        # Afișez informații despre datele încărcate
+        st.info(f"📅 Date disponibile: {first_day.strftime('%d/%m/%Y')} - {last_day.strftime('%d/%m/%Y')}")
         
-        # Obținem data de azi și luna curentă
+        # Perioada analizată se încheie azi sau la ultima zi cu date
         today = datetime.now()
-        current_month = today.month
-        current_year = 2025
-        comparison_year = 2024
+        anchor = min(pd.Timestamp(today.date()), last_day)
         
-        st.write(f"🗓️ **Analizăm**: {calendar.month_name[current_month]} 2025 (până în ziua {today.day}) vs {calendar.month_name[current_month]} 2024")
+        # Selectoare perioadă, ani de comparație și aliniere
+        col1, col2, col3 = st.columns(3)
         
-        # Filtrăm doar luna curentă până în ziua de azi pentru 2025
-        current_period_data = daily_sales_ytd[
-            (daily_sales_ytd['Data'].dt.year == current_year) & 
-            (daily_sales_ytd['Data'].dt.month == current_month) &
-            (daily_sales_ytd['Data'].dt.day <= today.day)
-        ]
+        with col1:
+            period_name = st.selectbox(
+                "🗓️ Perioada:", list(COMPARISON_PERIODS), index=1, key="comparatie_perioada"
+            )
+        with col2:
+            years_back = st.multiselect(
+                "📅 Compară cu:", [1, 2, 3], default=[1],
+                format_func=lambda n: f"{n} {'an' if n == 1 else 'ani'} în urmă",
+                key="comparatie_ani"
+            )
+        with col3:
+            align_name = st.radio(
+                "↔️ Aliniere:", list(COMPARISON_ALIGN), horizontal=True, key="comparatie_aliniere",
+                help="Pe ziua din perioadă (aceeași dată calendaristică) sau pe ziua săptămânii (52 de săptămâni pe an)"
+            )
         
-        # Filtrăm aceeași perioadă din 2024
-        comparison_period_data = daily_sales_ytd[
-            (daily_sales_ytd['Data'].dt.year == comparison_year) & 
-            (daily_sales_ytd['Data'].dt.month == current_month) &
-            (daily_sales_ytd['Data'].dt.day <= today.day)
-        ]
+        period = COMPARISON_PERIODS[period_name]
+        align = COMPARISON_ALIGN[align_name]
+        years_back = sorted(years_back)
         
-        st.write(f"📊 **Date găsite**: {len(current_period_data)} zile în 2025, {len(comparison_period_data)} zile în 2024")
+        if period == 'custom':
+            interval = st.date_input(
+                "📅 Interval personalizat:",
+                value=(max(period_bounds('month', anchor)[0], first_day).date(), anchor.date()),
+                min_value=first_day.date(),
+                max_value=last_day.date(),
+                format="DD/MM/YYYY",
+                key="comparatie_interval"
+            )
+            # În timpul selecției intervalul poate avea o singură zi
+            start = pd.Timestamp(interval[0]) if len(interval) > 0 else anchor
+            end = pd.Timestamp(interval[1]) if len(interval) > 1 else start
+        else:
+            start, end = period_bounds(period, anchor)
+        
+        phase("agregare YTD")
+        comparison, summary = ytd_period_comparison(
+            daily_sales_ytd, ytd_version, start, end, tuple(years_back), align
+        )
+        labels = {
+            back: f"{row['Start'].strftime('%d/%m/%Y')} - {row['End'].strftime('%d/%m/%Y')}"
+            for back, row in summary.iterrows()
+        }
+        
+        st.write(f"🗓️ **Analizăm**: {labels[0]}" + "".join(f" vs {labels[back]}" for back in years_back))
+        st.write(
+            f"📊 **Date găsite**: {summary.loc[0, 'Zile']} zile în perioada curentă"
+            + "".join(f", {summary.loc[back, 'Zile']} zile în {labels[back]}" for back in years_back)
+        )
         
         # Verificăm dacă avem date pentru comparație
-        has_comparison_data = len(comparison_period_data) > 0
+        has_comparison_data = bool(years_back) and summary.loc[years_back, 'Zile'].sum() > 0
         
-        # CHECKBOX pentru comparația cu 2024
+        # CHECKBOX pentru comparația cu perioadele anterioare
         if has_comparison_data:
             show_comparison = st.checkbox(
-                f"📊 AFIȘEAZĂ COMPARAȚIA: {calendar.month_name[current_month]} 2025 vs {calendar.month_name[current_month]} 2024", 
+                "📊 AFIȘEAZĂ COMPARAȚIA cu perioadele anterioare",
                 value=True,
-                help=f"Compară {len(current_period_data)} zile din 2025 cu {len(comparison_period_data)} zile din 2024"
+                help=f"Compară {summary.loc[0, 'Zile']} zile din perioada curentă cu aceleași perioade din anii anteriori"
             )
+        elif years_back:
+            show_comparison = False
+            st.error(f"❌ Nu sunt date disponibile pentru {', '.join(labels[back] for back in years_back)}")
         else:
             show_comparison = False
-            st.error(f"❌ Nu sunt date disponibile pentru {calendar.month_name[current_month]} 2024")
         
         # CREAREA GRAFICULUI
-        fig = go.Figure()
-        
         if show_comparison and has_comparison_data:
             st.success("✅ Se afișează graficul cu comparația!")
-            
-            # Linia pentru 2025 (continuă, albastră)
-            fig.add_trace(go.Scatter(
-                x=current_period_data['Data'],
-                y=current_period_data['Valoare'],
-                mode='lines+markers',
-                name=f'{calendar.month_name[current_month]} 2025',
-                line=dict(color='#1f77b4', width=4),
-                marker=dict(size=8, color='#1f77b4')
-            ))
-            
-            # Ajustez datele din 2024 pentru suprapunere vizuală
-            comparison_adjusted = comparison_period_data.copy()
-            comparison_adjusted['Data_Adjusted'] = comparison_adjusted['Data'].apply(
-                lambda x: x.replace(year=current_year)
-            )
-            
-            # Linia pentru 2024 (punctată, portocalie)
-            fig.add_trace(go.Scatter(
-                x=comparison_adjusted['Data_Adjusted'],
-                y=comparison_adjusted['Valoare'],
-                mode='lines+markers',
-                name=f'{calendar.month_name[current_month]} 2024',
-                line=dict(color='#ff7f0e', width=4, dash='dash'),
-                marker=dict(size=8, color='#ff7f0e'),
-                opacity=0.9
-            ))
-            
-            title = f'📈 COMPARAȚIE: {calendar.month_name[current_month]} 2025 vs {calendar.month_name[current_month]} 2024 (până în ziua {today.day})'
-            
         else:
-            st.info("📊 Se afișează doar datele pentru 2025")
+            st.info("📊 Se afișează doar datele pentru perioada curentă")
+        
+        shown_periods = [0] + (years_back if show_comparison and has_comparison_data else [])
+        
+        def build_comparison_figure():
+            """Graficul perioadei curente, opțional suprapus cu perioadele anterioare aliniate"""
+            fig = go.Figure()
+            
+            for back in shown_periods:
+                points = comparison[comparison['AniInUrma'] == back]
+                color = COMPARISON_COLORS[back % len(COMPARISON_COLORS)]
+                # Perioada curentă cu linie continuă, cele anterioare punctate, suprapuse pe zilele ei
+                fig.add_trace(go.Scatter(
+                    x=points['DataAliniata'],
+                    y=points['Valoare'],
+                    customdata=points['Data'],
+                    mode='lines+markers',
+                    name=labels[back],
+                    line=dict(color=color, width=4, dash=None if back == 0 else 'dash'),
+                    marker=dict(size=8, color=color),
+                    opacity=1 if back == 0 else 0.9,
+                    hovertemplate="%{customdata|%d/%m/%Y}: %{y:,.0f} RON<extra></extra>"
+                ))
             
-            # Grafic normal doar cu 2025
-            fig.add_trace(go.Scatter(
-                x=current_period_data['Data'],
-                y=current_period_data['Valoare'],
-                mode='lines+markers',
-                name=f'{calendar.month_name[current_month]} 2025',
-                line=dict(color='#1f77b4', width=4),
-                marker=dict(size=8)
-            ))
+            if len(shown_periods) > 1:
+                title = f'📈 COMPARAȚIE: {labels[0]} vs ' + ', '.join(labels[back] for back in shown_periods[1:])
+            else:
+                title = f'📈 Vânzări {labels[0]}'
             
-            title = f'📈 Vânzări {calendar.month_name[current_month]} 2025 (până în ziua {today.day})'
+            # Layout grafic
+            fig.update_layout(
+                title=title,
+                height=400,
+                xaxis_title="Data",
+                yaxis_title="Valoare Vânzări (RON)",
+                hovermode='x unified',
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.02,
+                    xanchor="right",
+                    x=1
+                ),
+                plot_bgcolor='white',
+                xaxis=dict(gridcolor='lightgray'),
+                yaxis=dict(gridcolor='lightgray')
+            )
+            return fig
         
-        # Layout grafic
-        fig.update_layout(
-            title=title,
-            height=400,
-            xaxis_title="Data",
-            yaxis_title="Valoare Vânzări (RON)",
-            hovermode='x unified',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            plot_bgcolor='white',
-            xaxis=dict(gridcolor='lightgray'),
-            yaxis=dict(gridcolor='lightgray')
+        phase("grafic YTD")
+        # Figura vine din cache-ul de figuri pentru aceeași versiune YTD, perioadă și opțiuni
+        fig = cached_figure(
+            'vanzari_comparatie', ytd_version,
+            {'start': start, 'end': end, 'perioade': tuple(shown_periods), 'aliniere': align},
+            build_comparison_figure
         )
         
         # Afișare grafic
         st.plotly_chart(fig, use_container_width=True)
         
         # STATISTICI
+        phase("statistici YTD")
         st.markdown("---")
         st.subheader("📈 Statistici Comparative")
         
+        current = summary.loc[0]
+        
         if show_comparison and has_comparison_data:
-            # Statistici cu comparație
+            # Statistici față de cea mai apropiată perioadă anterioară
+            reference = summary.loc[years_back[0]]
             col1, col2, col3, col4 = st.columns(4)
             
-            current_total = current_period_data['Valoare'].sum()
-            comparison_total = comparison_period_data['Valoare'].sum()
-            difference = current_total - comparison_total
+            difference = current['Total'] - reference['Total']
             
             with col1:
                 st.metric(
-                    "💰 Total 2025", 
-                    f"{current_total:,.0f} RON",
+                    "💰 Total perioadă curentă", 
+                    f"{current['Total']:,.0f} RON",
                     delta=f"{difference:,.0f} RON"
                 )
             
             with col2:
                 st.metric(
-                    "💰 Total 2024 (referință)", 
-                    f"{comparison_total:,.0f} RON"
+                    f"💰 Total {reference['Start'].year} (referință)", 
+                    f"{reference['Total']:,.0f} RON"
                 )
             
             with col3:
-                if len(current_period_data) > 0:
-                    current_avg = current_period_data['Valoare'].mean()
-                    comparison_avg = comparison_period_data['Valoare'].mean()
-                    avg_diff = current_avg - comparison_avg
-                    st.metric(
-                        "📊 Media zilnică 2025", 
-                        f"{current_avg:,.0f} RON",
-                        delta=f"{avg_diff:,.0f} RON"
-                    )
-                else:
-                    st.metric("📊 Media zilnică 2025", "0 RON")
+                avg_diff = current['Medie'] - reference['Medie']
+                st.metric(
+                    "📊 Media zilnică", 
+                    f"{current['Medie']:,.0f} RON",
+                    delta=f"{avg_diff:,.0f} RON"
+                )
             
             with col4:
                 # Procentaj creștere/scădere
-                if comparison_total > 0:
-                    percent_change = ((current_total - comparison_total) / comparison_total) * 100
+                if reference['Total'] > 0:
+                    percent_change = (difference / reference['Total']) * 100
                     st.metric(
                         "📈 Schimbare (%)", 
                         f"{percent_change:+.1f}%",
@@ -507,28 +547,38 @@ with tab2:
                     )
                 else:
                     st.metric("📈 Schimbare (%)", "N/A")
+            
+            # Cu mai mulți ani de comparație, un tabel cu toate perioadele
+            if len(years_back) > 1:
+                table = summary.assign(Perioada=[labels[back] for back in summary.index])
+                table['Schimbare (%)'] = [
+                    (current['Total'] - total) / total * 100 if total > 0 else None
+                    for total in table['Total']
+                ]
+                st.dataframe(
+                    table[['Perioada', 'Zile', 'Total', 'Medie', 'MaximZi', 'Schimbare (%)']],
+                    column_config={
+                        'Total': st.column_config.NumberColumn(format="%.0f RON"),
+                        'Medie': st.column_config.NumberColumn("Media zilnică", format="%.0f RON"),
+                        'MaximZi': st.column_config.NumberColumn("Cea mai bună zi", format="%.0f RON"),
+                        'Schimbare (%)': st.column_config.NumberColumn(format="%+.1f%%"),
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
                 
         else:
-            # Statistici normale doar pentru 2025
+            # Statistici normale doar pentru perioada curentă
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                total = current_period_data['Valoare'].sum()
-                st.metric("💰 Total", f"{total:,.0f} RON")
+                st.metric("💰 Total", f"{current['Total']:,.0f} RON")
             
             with col2:
-                if len(current_period_data) > 0:
-                    avg = current_period_data['Valoare'].mean()
-                    st.metric("📊 Media zilnică", f"{avg:,.0f} RON")
-                else:
-                    st.metric("📊 Media zilnică", "0 RON")
+                st.metric("📊 Media zilnică", f"{current['Medie']:,.0f} RON")
             
             with col3:
-                if len(current_period_data) > 0:
-                    best_day = current_period_data.loc[current_period_data['Valoare'].idxmax()]
-                    st.metric("🏆 Cea mai bună zi", f"{best_day['Valoare']:,.0f} RON")
-                else:
-                    st.metric("🏆 Cea mai bună zi", "0 RON")
+                st.metric("🏆 Cea mai bună zi", f"{current['MaximZi']:,.0f} RON")
     
     else:
         st.error("❌ Nu s-au putut încărca datele!")
@@ -0,0 +1,69 @@
+"""Cubul de agregate (utils/cube.py)"""
+
+import pandas as pd
+
+from utils.constants import DATASET_CUBES, DATASET_KPIS
+from utils.cube import AggregateCube
+from utils.kpis import compute_kpis
+
+
+def _cube(df):
+    return AggregateCube(df, time='Data', dimensions=['Agent', 'Client'], measures=['Valoare'])
+
+
+def test_rows_with_missing_dimension_are_kept():
+    df = pd.DataFrame({
+        'Data': pd.to_datetime(['2025-07-01', '2025-07-01', '2025-07-02']),
+        'Agent': pd.Categorical(['A', None, 'B']),
+        'Client': pd.Categorical(['X', 'Y', None]),
+        'Valoare': [10.0, 5.0, 7.0],
+    })
+    cube = _cube(df)
+
+    daily = cube.rollup(['Data'], ['Valoare'])
+    assert daily['Valoare'].tolist() == [15.0, 7.0]
+    assert cube.rollup(['Agent'], ['Valoare'])['Valoare'].sum() == 22.0
+    assert cube.rollup(['Data'], ['Valoare'], '2025-07-01', '2025-07-01')['Valoare'].tolist() == [15.0]
+    assert cube.rollup(['Client'], ['Valoare'], filters={'Agent': ['A']})['Valoare'].tolist() == [10.0]
+
+
+def test_rows_without_date_only_count_in_whole_period():
+    df = pd.DataFrame({
+        'Data': pd.to_datetime(['2025-07-01', None, '2025-07-02']),
+        'Agent': ['A', 'A', 'B'],
+        'Client': ['X', 'X', 'Y'],
+        'Valoare': [10.0, 5.0, 7.0],
+    })
+    cube = _cube(df)
+
+    assert cube.bounds() == (pd.Timestamp('2025-07-01'), pd.Timestamp('2025-07-02'))
+    assert cube.rollup(['Agent'], ['Valoare'])['Valoare'].sum() == 22.0
+    # Intervalul implicit al filtrelor (toate zilele) este perioada întreagă
+    assert cube.rollup(['Agent'], ['Valoare'], '2025-07-01', '2025-07-02')['Valoare'].sum() == 22.0
+    assert cube.rollup(['Agent'], ['Valoare'], '2025-07-02', None)['Valoare'].sum() == 7.0
+    assert cube.rollup(['Agent'], ['Valoare'], None, '2025-07-01')['Valoare'].sum() == 10.0
+
+
+def test_unfiltered_purchases_value_matches_header_total():
+    # Exporturile CIIS nu garantează câmpuri completate (pagina Cumpărări Intrări)
+    df = pd.DataFrame({
+        'Data': pd.to_datetime(['2025-07-01', '2025-07-01', '2025-07-03', None]),
+        'Gestiune': pd.Categorical(['G1', None, 'G2', 'G1']),
+        'Denumire grupa': pd.Categorical([None, 'Gr', 'Gr', 'Gr']),
+        'Furnizor': pd.Categorical(['F1', 'F2', None, 'F1']),
+        'Denumire': pd.Categorical(['P1', 'P2', 'P3', None]),
+        'UM': pd.Categorical(['buc', None, 'kg', 'buc']),
+        'Serie': ['S1', 'S2', 'S3', 'S4'],
+        'Valoare': [100.0, 40.0, 25.0, 5.0],
+        'Cantitate': [1.0, 2.0, 3.0, 4.0],
+    })
+    cube = AggregateCube(df, **DATASET_CUBES['cumparari_ciis'])
+    kpis = compute_kpis(df, **DATASET_KPIS['cumparari_ciis'])
+    first_day, last_day = cube.bounds()
+    no_filters = {'Gestiune': [], 'Denumire grupa': [], 'Furnizor': []}
+
+    pe_furnizori = cube.rollup(['Furnizor'], None, first_day, last_day, no_filters)
+    pe_produse = cube.rollup(['Denumire', 'UM', 'Furnizor'], None, first_day, last_day, no_filters)
+
+    assert pe_furnizori['Valoare'].sum() == kpis.total('Valoare') == 170.0
+    assert pe_produse['Valoare'].sum() == kpis.total('Valoare')
@@ -0,0 +1,20 @@
+"""Filtrarea pe indexuri (utils/indexes.py, utils/filters.py)"""
+
+import pandas as pd
+
+from utils.filters import FrameFilter
+from utils.indexes import build_indexes
+
+
+def test_isin_with_repeated_values_matches_pandas():
+    df = pd.DataFrame({
+        'Denumire': pd.Categorical(['P1', 'P2', 'P1', 'P3', 'P2', 'P1']),
+        'Agent': pd.Categorical(['A', 'A', 'B', 'A', 'B', 'A']),
+    })
+    indexes = build_indexes(df, ['Denumire', 'Agent'])
+    selection = ['P1', 'P2', 'P1']
+
+    result = FrameFilter(df, indexes).isin('Denumire', selection).isin('Agent', ['A']).result()
+    expected = df[df['Denumire'].isin(selection) & (df['Agent'] == 'A')]
+
+    assert result.index.tolist() == expected.index.tolist()
@@ -0,0 +1,18 @@
+"""Comparațiile pe perioade (utils/periods.py)"""
+
+import pandas as pd
+
+from utils.periods import compare_periods
+
+
+def test_day_alignment_keeps_calendar_date_across_leap_day():
+    daily = pd.Series(1.0, index=pd.date_range('2024-01-01', '2025-12-31'))
+
+    comparison = compare_periods(daily, '2025-01-01', '2025-07-26', years=(1,))
+    prior = comparison[comparison['AniInUrma'] == 1].set_index('Data')
+
+    assert prior.loc['2024-02-29', 'DataAliniata'] == pd.Timestamp('2025-02-28')
+    assert prior.loc['2024-03-01', 'DataAliniata'] == pd.Timestamp('2025-03-01')
+    assert prior.loc['2024-07-26', 'DataAliniata'] == pd.Timestamp('2025-07-26')
+    assert comparison['DataAliniata'].max() == pd.Timestamp('2025-07-26')
+    assert (comparison['Zi'] == (comparison['DataAliniata'] - pd.Timestamp('2025-01-01')).dt.days).all()
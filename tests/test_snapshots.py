@@ -0,0 +1,58 @@
+"""Snapshot-urile Parquet ale fișierelor Excel (utils/snapshots.py)"""
+
+from datetime import datetime
+
+import pytest
+from openpyxl import Workbook
+
+from utils import snapshots
+from utils.constants import DATASET_SCHEMAS
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", str(directory))
+    return directory
+
+
+def _write_workbook(path, rows):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Data", "Cod", "Valoare"])
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def test_mixed_type_column_returns_parsed_frame(tmp_path, snapshot_dir):
+    # Coduri numerice și text în aceeași coloană - Parquet refuză coloana
+    path = tmp_path / "VS.xlsx"
+    _write_workbook(path, [
+        [datetime(2025, 7, 1), 123, 10.0],
+        [datetime(2025, 7, 1), "A12", 5.0],
+        [datetime(2025, 7, 2), 456, 7.5],
+    ])
+
+    df = snapshots.read_excel_snapshot(str(path), None, DATASET_SCHEMAS['vanzari'])
+
+    assert list(df['Cod']) == [123, "A12", 456]
+    assert df['Valoare'].sum() == 22.5
+    # Nici citirea următoare nu cade pe un depozit parțial scris
+    again = snapshots.read_excel_snapshot(str(path), None, DATASET_SCHEMAS['vanzari'])
+    assert again.equals(df)
+
+
+def test_partitioned_store_round_trip(tmp_path, snapshot_dir):
+    path = tmp_path / "VS.xlsx"
+    _write_workbook(path, [
+        [datetime(2025, 7, 2), "B1", 7.5],
+        [datetime(2025, 7, 1), "A1", 10.0],
+    ])
+
+    parsed = snapshots.read_excel_snapshot(str(path), None, DATASET_SCHEMAS['vanzari'])
+    assert snapshots.has_snapshot(str(path), None, DATASET_SCHEMAS['vanzari'])
+    stored = snapshots.read_excel_snapshot(str(path), None, DATASET_SCHEMAS['vanzari'])
+
+    assert parsed['Data'].is_monotonic_increasing
+    assert stored.equals(parsed)
@@ -0,0 +1,55 @@
+"""
+Analiza pe vechimi a scadențelor (facturi neachitate, neîncasate, efecte)
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.constants import AGING_BUCKETS
+
+# Coloana cu intervalul de vechime și eticheta scadențelor lipsă
+AGING_COLUMN = 'Vechime'
+UNKNOWN_BUCKET = 'Necunoscută'
+
+
+def days_past_due(dates, today):
+    """
+    Zilele trecute de la scadență până la `today` (negative = scadență
+    viitoare), calculate pe zile întregi, și masca scadențelor lipsă.
+    """
+    due = pd.Series(dates).to_numpy().astype('datetime64[D]')
+    missing = np.isnat(due)
+    days = (np.datetime64(today, 'D') - due).astype(np.int64)
+    days[missing] = 0
+    return days, missing
+
+
+def assign_buckets(dates, today, buckets=AGING_BUCKETS):
+    """
+    Intervalul de vechime al fiecărei scadențe, ca Categorical ordonat
+    (intervalele în ordinea din `buckets`, apoi "Necunoscută").
+    """
+    days, missing = days_past_due(dates, today)
+    starts = np.array([start for _, start in buckets[1:]], dtype=np.int64)
+    codes = np.searchsorted(starts, days, side='right')
+    codes[missing] = len(buckets)
+    labels = [label for label, _ in buckets] + [UNKNOWN_BUCKET]
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+def aging_summary(df, due, counterparty, measures, today, buckets=AGING_BUCKETS):
+    """
+    Sumele `measures` și numărul de documente pe interval de vechime și
+    partener (inclusiv documentele fără partener, ca totalurile să fie
+    complete). Rezultatul are câteva sute de rânduri și poate fi filtrat sau
+    rulat pe interval direct de pagini.
+    """
+    measures = [col for col in measures if col in df.columns]
+    if due not in df.columns or counterparty not in df.columns:
+        return pd.DataFrame(columns=[AGING_COLUMN, counterparty] + measures + ['Documente'])
+
+    keys = [pd.Series(assign_buckets(df[due], today, buckets), index=df.index, name=AGING_COLUMN), df[counterparty]]
+    groups = df.groupby(keys, observed=True, dropna=False)
+    summary = groups[measures].sum()
+    summary['Documente'] = groups.size()
+    return summary.reset_index()
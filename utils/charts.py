@@ -0,0 +1,56 @@
+"""
+Date pentru graficele ierarhice Plotly (sunburst, treemap)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def hierarchy_arrays(df, levels, value, customdata=(), root=None, sep="/"):
+    """
+    Construiește vectorii `ids`, `labels`, `parents`, `values` (și
+    `customdata`) pentru go.Sunburst / go.Treemap, pe orice număr de niveluri.
+
+    Fiecare nivel este o agregare groupby pe prefixul de niveluri, iar
+    id-urile sunt căile nodurilor (valorile nivelurilor unite prin `sep`),
+    construite cu operații pe coloane - fără bucle pe rânduri și fără
+    formatarea sumelor în Python (se fac în texttemplate/hovertemplate, din
+    `values` și `customdata`). Ca în groupby, un rând cu valoare lipsă pe un
+    nivel contribuie doar la nodurile de deasupra lui. Cu `root` se adaugă
+    un nod rădăcină cu totalul tuturor rândurilor.
+    """
+    sums = [value] + list(customdata)
+    frames = []
+
+    if root is not None:
+        totals = df[sums].sum()
+        frames.append(pd.DataFrame({
+            'ids': [root], 'labels': [root], 'parents': [""],
+            **{col: [totals[col]] for col in sums},
+        }))
+
+    parent_prefix = root if root is not None else ""
+    for depth in range(1, len(levels) + 1):
+        nodes = df.groupby(levels[:depth], observed=True)[sums].sum().reset_index()
+        path = nodes[levels[0]].astype(str)
+        parents = pd.Series(parent_prefix, index=nodes.index)
+        for level in levels[1:depth]:
+            parents = path
+            path = path + sep + nodes[level].astype(str)
+        frames.append(pd.DataFrame({
+            'ids': path,
+            'labels': nodes[levels[depth - 1]].astype(str),
+            'parents': parents,
+            **{col: nodes[col] for col in sums},
+        }))
+
+    nodes = pd.concat(frames, ignore_index=True)
+    arrays = {
+        'ids': nodes['ids'].to_numpy(),
+        'labels': nodes['labels'].to_numpy(),
+        'parents': nodes['parents'].to_numpy(),
+        'values': nodes[value].to_numpy(),
+    }
+    if customdata:
+        arrays['customdata'] = np.column_stack([nodes[col].to_numpy() for col in customdata])
+    return arrays
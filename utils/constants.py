@@ -1 +1,216 @@
 # Constante și mapări coloane
+
+# Fișierele Excel exportate din ERP, pe seturi de date
+DATA_FILES = {
+    'balanta_la_data': "data/LaData.xlsx",
+    'balanta_perioada': "data/Perioada.xlsx",
+    'neachitate': "data/FacturiNeachitate.xlsx",
+    'neincasate': "data/FacturiNeincasate.xlsx",
+    'scadente_plati': "data/ScadentePlatiCuEfecte.xlsx",
+    'vanzari': "data/VS.xlsx",
+    'cumparari_ciis': "data/CIIS.xlsx",
+    'cumparari_cipd': "data/CIPD.xlsx",
+    'ytd': "data/YTD.xlsx",
+}
+
+# Coloanele citite din fiecare fișier (None = toate coloanele).
+# Paginile care afișează tabelul complet păstrează toate coloanele.
+DATASET_COLUMNS = {
+    'balanta_la_data': [
+        'DenumireGest', 'Denumire', 'UM', 'Pret', 'Stoc final', 'PretVanzare',
+        'Producator', 'ValoareStocFinal', 'ValoareVanzare',
+    ],
+    'balanta_perioada': [
+        'Denumire gestiune', 'Denumire', 'UM', 'Pret vanzare', 'Stoc final',
+        'Valoare intrare', 'Producator', 'Furnizor IN',
+    ],
+    'neachitate': None,
+    'neincasate': None,
+    'scadente_plati': None,
+    'vanzari': None,
+    'cumparari_ciis': None,
+    'cumparari_cipd': None,
+    'ytd': ['Data', 'Valoare'],
+}
+
+# Schema tipizată a fiecărui set de date, aplicată o singură dată la încărcare:
+#   categories - dimensiuni text stocate ca pd.Categorical (filtre/grupări pe coduri întregi)
+#   dates      - coloane convertite la datetime64
+#   integers   - coloane întregi reduse la cel mai mic tip care le încape
+#   floats     - procente/rapoarte reduse la float32
+#   sort_by    - coloana de date după care rândurile sunt sortate (interval de date = felie contiguă)
+#   partition_by - coloana de date după care exporturile care doar adaugă zile noi
+#                  se ingerează append-only (vezi read_excel_partitioned)
+# Valorile monetare și cantitățile rămân float64, pentru ca totalurile să fie exacte.
+DATASET_SCHEMAS = {
+    'balanta_la_data': {
+        'categories': ['DenumireGest', 'Denumire', 'UM', 'Producator'],
+    },
+    'balanta_perioada': {
+        'categories': ['Denumire gestiune', 'Denumire', 'UM', 'Furnizor IN', 'Producator'],
+    },
+    'neachitate': {
+        'categories': ['Valuta', 'Furnizor', 'Tip', 'PL'],
+        'dates': ['Data', 'DataScadenta'],
+        'integers': ['Numar', 'Achitat_V'],
+    },
+    'neincasate': {
+        'categories': ['Valuta', 'Client', 'Tip', 'Agent'],
+        'dates': ['Data', 'DataScadenta'],
+        'integers': ['NumarDoc', 'Total_V', 'Sold_V', 'Achitat_V'],
+    },
+    'scadente_plati': {
+        'categories': [
+            'StareLaData', 'Tip', 'Emitent', 'Tert', 'ContContabil', 'Banca',
+            'ContEmitent', 'BancaEmitent', 'StareCurenta', 'Agent',
+        ],
+        'dates': ['Data', 'DataScadenta', 'DataEmiterii'],
+        'integers': ['Numar', 'NrGirari'],
+    },
+    'vanzari': {
+        'categories': [
+            'DenumireGestiune', 'Denumire grupa', 'Denumire', 'Cod', 'UM', 'Client',
+            'Serie', 'Tip', 'Agent', 'CodFiscal', 'Delegat', 'Categorie', 'Producator',
+            'CategorieProdus', 'Ramura', 'CategorieTert', 'Locatie Tert', 'PL',
+        ],
+        'dates': ['Data'],
+        'integers': ['Numar fisa', 'Numar', 'Gestiune'],
+        'floats': ['TVA %', 'Adaos/ValoareContabila', 'Adaos/(ValoareContabila-Adaos)'],
+        'sort_by': 'Data',
+        'partition_by': 'Data',
+    },
+    'cumparari_ciis': {
+        'categories': [
+            'Gestiune', 'Denumire grupa', 'Denumire', 'Cod', 'UM', 'Furnizor',
+            'Serie', 'Tip', 'Producator', 'PL',
+        ],
+        'dates': ['Data'],
+        'integers': ['Numar fisa', 'Numar', 'NrGestiune'],
+        'sort_by': 'Data',
+        'partition_by': 'Data',
+    },
+    'cumparari_cipd': {
+        'categories': [
+            'Valuta', 'Furnizor', 'Serie', 'Tip', 'Grupa', 'Denumire', 'Cod', 'UM',
+            'Categorie', 'Gestiune', 'PL',
+        ],
+        'dates': ['Data'],
+        'integers': ['Numar'],
+        'floats': ['Discount %', 'TVA %'],
+        'sort_by': 'Data',
+        'partition_by': 'Data',
+    },
+    'ytd': {
+        'dates': ['Data'],
+        'partition_by': 'Data',
+    },
+}
+
+# Dimensiunile filtrate prin multiselect, pentru care se construiesc indexuri inversate
+DATASET_INDEXES = {
+    'balanta_la_data': ['DenumireGest', 'Producator', 'Denumire'],
+    'balanta_perioada': ['Denumire gestiune', 'Denumire', 'Furnizor IN', 'Producator'],
+    'neachitate': ['Furnizor'],
+    'neincasate': ['Client', 'Agent'],
+    'scadente_plati': ['Tert'],
+    'vanzari': ['DenumireGestiune', 'Agent', 'Denumire', 'Client'],
+}
+
+# Ierarhiile de dimensiuni pentru opțiunile filtrelor (în cascadă sau independente)
+DATASET_HIERARCHIES = {
+    'balanta_la_data': ['DenumireGest', 'Producator', 'Denumire'],
+    'balanta_perioada': ['Denumire gestiune', 'Denumire', 'Furnizor IN', 'Producator'],
+}
+
+# Cuburile de agregate: sume pe zi (coloana `time`) × dimensiuni, din care
+# graficele și vizualizările grupate se obțin prin roll-up
+DATASET_CUBES = {
+    'vanzari': {
+        'time': 'Data',
+        'dimensions': ['DenumireGestiune', 'Agent', 'Client', 'Denumire'],
+        'measures': ['Valoare', 'Adaos', 'Cantitate'],
+    },
+    'cumparari_ciis': {
+        'time': 'Data',
+        'dimensions': ['Gestiune', 'Denumire grupa', 'Furnizor', 'Denumire', 'UM'],
+        'measures': ['Valoare', 'Cantitate'],
+    },
+    'cumparari_cipd': {
+        'time': 'Data',
+        'dimensions': ['Gestiune', 'Grupa', 'Furnizor', 'Denumire', 'UM'],
+        'measures': ['Valoare', 'Cantitate', 'Discount'],
+    },
+}
+
+# Intervalele de vechime a scadenței: (etichetă, prima zi a intervalului), în zile
+# trecute de la scadență (negative = scadență viitoare); primul interval nu are
+# limită inferioară. Scadențele lipsă intră în intervalul "Necunoscută".
+AGING_BUCKETS = [
+    ('Viitoare > 30 zile', None),
+    ('Viitoare 1-30 zile', -30),
+    ('Azi', 0),
+    ('Depășită 1-30 zile', 1),
+    ('Depășită 31-60 zile', 31),
+    ('Depășită 61-90 zile', 61),
+    ('Depășită > 90 zile', 91),
+]
+
+# Coloanele analizei pe vechimi: data scadenței, partenerul și sumele agregate
+DATASET_AGING = {
+    'neachitate': {'due': 'DataScadenta', 'counterparty': 'Furnizor', 'measures': ['Total', 'Sold']},
+    'neincasate': {'due': 'DataScadenta', 'counterparty': 'Client', 'measures': ['Total', 'Sold']},
+    'scadente_plati': {'due': 'DataScadenta', 'counterparty': 'Tert', 'measures': ['Suma']},
+}
+
+# Indicatorii din antetul paginilor, calculați o singură dată per versiune de
+# date: sume pe coloane, numărul de valori distincte, sume de produse între
+# două coloane (nume -> (coloană, coloană)) și sume pe zile (coloană -> coloana de dată)
+DATASET_KPIS = {
+    'vanzari': {'sums': ['Valoare'], 'distinct': ['Client', 'DenumireGestiune']},
+    'balanta_la_data': {'sums': ['ValoareStocFinal', 'ValoareVanzare']},
+    'balanta_perioada': {
+        'sums': ['Valoare intrare'],
+        'products': {'ValoarePretVanzare': ('Stoc final', 'Pret vanzare')},
+    },
+    'neachitate': {'sums': ['Sold'], 'daily': {'Sold': 'DataScadenta'}},
+    'neincasate': {'sums': ['Total', 'Sold', 'Achitat']},
+    'scadente_plati': {'sums': ['Suma']},
+    'cumparari_ciis': {'sums': ['Valoare'], 'distinct': ['Furnizor', 'Denumire', 'Serie']},
+    'cumparari_cipd': {'sums': ['Valoare', 'Discount'], 'distinct': ['Furnizor', 'Denumire', 'Serie']},
+}
+
+# Director pentru snapshot-urile columnare (Parquet) ale fișierelor Excel
+SNAPSHOT_DIR = "data/.cache"
+
+# Numărul maxim de fișiere de adăugare ale unui depozit append-only, după
+# care depozitul se compactează într-un singur snapshot
+SNAPSHOT_MAX_APPENDS = 8
+
+# Intervalul (secunde) la care se verifică dacă fișierele de date au fost înlocuite
+DATA_WATCH_INTERVAL = 5
+
+# Numărul de rânduri trimise browserului pe o pagină de tabel (vezi paginated_table)
+TABLE_PAGE_SIZE = 100
+
+# Memoria maximă (octeți de JSON) a cache-ului de figuri Plotly, partajat de toate sesiunile
+FIGURE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Numărul maxim de rezultate păstrate în cache-ul calculelor derivate (vezi utils/derived_cache.py)
+DERIVED_CACHE_MAX_ENTRIES = 256
+
+# Versiunile păstrate per set de date pentru structurile construite o dată per
+# versiune (indexuri, cub, ierarhie, vechimi, KPI), în afara limitei de mai sus:
+# versiunea publicată și cea pregătită de reîmprospătarea în fundal
+DERIVED_CACHE_VERSIONS = 2
+
+# Măsurarea duratelor pe faze (vezi utils/timing.py): se activează per sesiune
+# cu parametrul de URL ?timing=1, iar fiecare rulare se adaugă în fișierul JSONL
+TIMING_QUERY_PARAM = "timing"
+TIMING_LOG_FILE = "data/.cache/timings.jsonl"
+
+# Profilarea rulărilor (vezi utils/profiling.py): o singură rulare cu ?profile=1
+# (parametrul se consumă), sau toate rulările cu variabila de mediu BRENADO_PROFILE=1
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ENV_VAR = "BRENADO_PROFILE"
+PROFILE_DIR = "data/.cache/profiles"
+PROFILE_SAMPLE_INTERVAL = 0.005
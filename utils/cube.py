@@ -0,0 +1,89 @@
+"""
+Cub de agregate pre-calculate pentru tablourile de bord
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class AggregateCube:
+    """
+    Sumele măsurilor pe zi × dimensiuni, calculate o singură dată per
+    versiune de date.
+
+    Rândurile cubului sunt sortate după zi, deci un interval de date este o
+    felie contiguă găsită prin căutare binară. Roll-up-urile pe întreaga
+    perioadă (graficele principale) sunt memorate în cub - după primul apel
+    costul lor nu mai depinde de numărul de tranzacții. Valorile lipsă ale
+    dimensiunilor (și zilele lipsă) formează grupuri proprii, astfel încât
+    totalurile cubului sunt totalurile tuturor rândurilor; rândurile fără
+    zi intră doar în agregările pe întreaga perioadă (inclusiv un interval
+    care acoperă toate zilele, ca în filtrele implicite ale paginilor).
+    """
+
+    def __init__(self, df, time, dimensions, measures):
+        self.time = time
+        self.dimensions = [col for col in dimensions if col in df.columns]
+        self.measures = [col for col in measures if col in df.columns]
+        self._rollups = {}
+
+        keys = [df[time].dt.normalize()] + self.dimensions
+        self.data = (
+            df.groupby(keys, observed=True, sort=False, dropna=False)[self.measures].sum()
+            .reset_index()
+            .sort_values(time, kind='stable', na_position='last', ignore_index=True)
+        )
+        self._days = self.data[time].to_numpy()
+        # Zilele lipsă sunt la final - prima și ultima zi sunt dintre cele existente
+        dated = self._days[~np.isnat(self._days)]
+        self._dated = len(dated)
+        self._first_day, self._last_day = (dated[0], dated[-1]) if len(dated) else (None, None)
+
+    def bounds(self):
+        """Prima și ultima zi din cub (Timestamp), sau (None, None) dacă este gol"""
+        if self._first_day is None:
+            return None, None
+        return pd.Timestamp(self._first_day), pd.Timestamp(self._last_day)
+
+    def _slice(self, start_date, end_date):
+        """Rândurile cubului cu ziua în intervalul închis [start_date, end_date]"""
+        if start_date is None and end_date is None:
+            return self.data
+        lo = 0 if start_date is None else np.searchsorted(self._days, np.datetime64(start_date, 'D'), side='left')
+        hi = self._dated if end_date is None else np.searchsorted(self._days, np.datetime64(end_date, 'D'), side='right')
+        return self.data.iloc[lo:hi]
+
+    def rollup(self, by, measures=None, start_date=None, end_date=None, filters=None):
+        """
+        Agregă cubul pe dimensiunile `by` (ziua se cere prin numele coloanei
+        de timp), opțional doar pe intervalul [start_date, end_date] și pe
+        rândurile ale căror dimensiuni au una dintre valorile din `filters`
+        (dimensiune -> valori; o selecție goală nu filtrează).
+        """
+        by = [col for col in by if col == self.time or col in self.dimensions]
+        measures = [col for col in (measures or self.measures) if col in self.measures]
+        filters = {col: values for col, values in (filters or {}).items() if col in self.dimensions and len(values)}
+
+        # Un interval care acoperă toate zilele cubului este perioada întreagă
+        if self._first_day is not None:
+            if start_date is not None and np.datetime64(start_date, 'D') <= self._first_day:
+                start_date = None
+            if end_date is not None and np.datetime64(end_date, 'D') >= self._last_day:
+                end_date = None
+
+        key = (tuple(by), tuple(measures))
+        memoised = start_date is None and end_date is None and not filters
+        if memoised and key in self._rollups:
+            return self._rollups[key]
+
+        rows = self._slice(start_date, end_date)
+        if filters:
+            mask = np.ones(len(rows), dtype=bool)
+            for col, values in filters.items():
+                mask &= rows[col].isin(list(values)).to_numpy()
+            rows = rows[mask]
+
+        result = rows.groupby(by, observed=True, dropna=False)[measures].sum().reset_index()
+        if memoised:
+            self._rollups[key] = result
+        return result
@@ -2,14 +2,377 @@
 Funcții pentru încărcarea datelor din fișierele Excel
 """
 
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+
 import streamlit as st
 import pandas as pd
 
-@st.cache_data
+from utils.constants import (
+    DATA_FILES, DATA_WATCH_INTERVAL, DATASET_AGING, DATASET_COLUMNS, DATASET_CUBES,
+    DATASET_HIERARCHIES, DATASET_INDEXES, DATASET_KPIS, DATASET_SCHEMAS,
+)
+from utils.aging import aging_summary
+from utils.cube import AggregateCube
+from utils.dataset_store import DatasetStore, read_only_view
+from utils.derived_cache import derived_cache, versioned_derivation
+from utils.hierarchy import DimensionHierarchy
+from utils.indexes import build_indexes
+from utils.kpis import compute_kpis
+from utils.snapshots import file_fingerprint, has_snapshot, read_excel_snapshot
+from utils.sql import SqlBackend, aggregate_frame, duckdb
+
+def _file_version(dataset):
+    """Versiunea fișierului sursă al setului de date, derivată din conținutul lui"""
+    try:
+        return file_fingerprint(DATA_FILES[dataset])
+    except OSError:
+        return "missing"
+
+
+# Versiunile publicate fixate pentru rularea de pe firul curent (vezi dataset_snapshot)
+_rerun = threading.local()
+
+
+@contextmanager
+def dataset_snapshot():
+    """
+    Fixează, pe durata unei rulări, versiunile publicate ale tuturor seturilor
+    de date: o publicare făcută între timp de DataRefreshScheduler se vede
+    abia la rularea următoare. Întoarce snapshot-ul - set de date ->
+    (versiune, cadru, momentul publicării).
+    """
+    _rerun.snapshot = get_dataset_store().snapshot()
+    try:
+        yield _rerun.snapshot
+    finally:
+        _rerun.snapshot = None
+
+
+def _published(dataset):
+    snapshot = getattr(_rerun, 'snapshot', None)
+    if snapshot is not None and snapshot.get(dataset) is not None:
+        return snapshot[dataset]
+    return get_dataset_store().current(dataset)
+
+
+def get_data_version(dataset):
+    """
+    Tokenul de versiune al unui set de date: versiunea publicată văzută de
+    rularea curentă sau, pentru un set încă nepublicat, cea a fișierului sursă.
+
+    Tokenul face parte din cheia cache-urilor, astfel încât un fișier
+    înlocuit produce automat o intrare nouă.
+    """
+    published = _published(dataset)
+    return published[0] if published is not None else _file_version(dataset)
+
+
+# Cadre parsate de procesele de warm-up, preluate de _read_dataset
+_prefetched = {}
+
+
+@st.cache_resource
+def get_dataset_store():
+    """Depozitul de seturi de date al procesului (vezi utils/dataset_store.py)"""
+    return DatasetStore()
+
+
+def _read_dataset(dataset, data_version):
+    """
+    Parsează un set de date pentru o anumită versiune a fișierului.
+    Cadrul poartă în `attrs` numele setului și versiunea din care provine.
+    """
+    df = _prefetched.pop((dataset, data_version), None)
+    if df is None:
+        df = read_excel_snapshot(
+            DATA_FILES[dataset], DATASET_COLUMNS.get(dataset), DATASET_SCHEMAS.get(dataset)
+        )
+    df.attrs['dataset'] = dataset
+    df.attrs['data_version'] = data_version
+    return df
+
+
+def _load_dataset(dataset, data_version):
+    """
+    Vederea cadrului partajat al setului de date, la versiunea dată. Cadrul
+    este parsat o singură dată per versiune, oricâte sesiuni îl cer simultan,
+    și nu este copiat pentru fiecare sesiune (spre deosebire de st.cache_data).
+    """
+    return get_dataset_store().get(dataset, data_version, lambda: _read_dataset(dataset, data_version))
+
+
+def load_dataset(dataset):
+    """
+    Versiunea publicată a unui set de date (cea fixată pentru rularea curentă,
+    vezi dataset_snapshot). Versiunile noi sunt parsate și publicate în fundal
+    de DataRefreshScheduler; doar un set încă nepublicat - la pornire sau fără
+    warm-up - se încarcă pe loc, o singură dată per versiune.
+    """
+    published = _published(dataset)
+    if published is not None:
+        return read_only_view(published[1])
+    df = _load_dataset(dataset, _file_version(dataset))
+    snapshot = getattr(_rerun, 'snapshot', None)
+    if snapshot is not None:
+        snapshot[dataset] = get_dataset_store().current(dataset)
+    return df
+
+
+@versioned_derivation
+def _build_indexes(df, dataset, data_version, row_count):
+    """Indexurile (inversate și de interval), construite o singură dată per versiune de date"""
+    sorted_column = (DATASET_SCHEMAS.get(dataset) or {}).get('sort_by')
+    return build_indexes(df, DATASET_INDEXES.get(dataset, []), sorted_column)
+
+
+def load_indexes(df):
+    """
+    Indexurile inversate ale cadrului `df` returnat de un loader.
+
+    Cheia include numărul de rânduri: un cadru deja filtrat moștenește
+    `attrs`, dar nu poate refolosi pozițiile cadrului complet. Pentru datele
+    demo nu există indexuri și filtrarea se face prin scanare.
+    """
+    dataset = df.attrs.get('dataset')
+    if dataset is None:
+        return {}
+    return _build_indexes(df, dataset, df.attrs['data_version'], len(df))
+
+
+@st.cache_resource(show_spinner="Se pregătesc datele...")
+def warm_up_datasets():
+    """
+    Parsează în paralel, într-un pool de procese, toate fișierele din data/
+    care nu au încă snapshot și publică rezultatele în cache-ul loader-elor.
+
+    openpyxl este limitat de GIL, așa că procesele separate fac ca durata
+    totală să fie dată de cel mai lent fișier, nu de suma lor.
+    """
+    versions = {dataset: _file_version(dataset) for dataset in DATA_FILES}
+    pending = {
+        dataset: DATA_FILES[dataset]
+        for dataset, version in versions.items()
+        if version != "missing"
+        and not has_snapshot(
+            DATA_FILES[dataset], DATASET_COLUMNS.get(dataset), DATASET_SCHEMAS.get(dataset)
+        )
+    }
+
+    if pending:
+        with ProcessPoolExecutor(
+            max_workers=min(len(pending), os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            futures = {
+                dataset: pool.submit(
+                    read_excel_snapshot, path,
+                    DATASET_COLUMNS.get(dataset), DATASET_SCHEMAS.get(dataset),
+                )
+                for dataset, path in pending.items()
+            }
+            for dataset, future in futures.items():
+                try:
+                    _prefetched[(dataset, versions[dataset])] = future.result()
+                except Exception:
+                    pass  # Setul de date se va încărca la cerere
+
+    for dataset, version in versions.items():
+        if version != "missing":
+            try:
+                _prepare_dataset(_load_dataset(dataset, version))
+            except Exception:
+                pass
+    return versions
+
+
+def _prepare_dataset(df):
+    """
+    Structurile derivate ale unui cadru nou încărcat - indexuri, ierarhie, cub,
+    vechimi, indicatori -, construite înainte ca prima cerere să aibă nevoie de ele.
+    """
+    dataset = df.attrs['dataset']
+    load_indexes(df)
+    if dataset in DATASET_HIERARCHIES:
+        load_hierarchy(df)
+    if dataset in DATASET_CUBES:
+        load_cube(df, dataset)
+    if dataset in DATASET_AGING:
+        load_aging(df, dataset, date.today())
+    load_kpis(df)
+
+
+@versioned_derivation
+def _build_hierarchy(df, dataset, data_version, row_count):
+    """Ierarhia de dimensiuni, construită o singură dată per versiune de date"""
+    return DimensionHierarchy(df, DATASET_HIERARCHIES.get(dataset, []))
+
+
+def load_hierarchy(df, levels=None):
+    """
+    Ierarhia de dimensiuni a cadrului `df` returnat de un loader (vezi
+    DATASET_HIERARCHIES). Pentru datele demo se construiește pe loc din `levels`.
+    """
+    dataset = df.attrs.get('dataset')
+    if dataset is None:
+        return DimensionHierarchy(df, levels or [])
+    return _build_hierarchy(df, dataset, df.attrs['data_version'], len(df))
+
+
+@versioned_derivation
+def _build_cube(df, dataset, data_version, row_count):
+    """Cubul de agregate, construit o singură dată per versiune de date"""
+    return AggregateCube(df, **DATASET_CUBES[dataset])
+
+
+def load_cube(df, dataset):
+    """
+    Cubul de agregate (vezi DATASET_CUBES) al cadrului `df` returnat de
+    loader-ul setului `dataset`. Pentru datele demo se construiește pe loc.
+    """
+    if df.attrs.get('dataset') != dataset:
+        return AggregateCube(df, **DATASET_CUBES[dataset])
+    return _build_cube(df, dataset, df.attrs['data_version'], len(df))
+
+
+@versioned_derivation
+def _build_aging(df, dataset, data_version, row_count, today):
+    """Sumele pe vechime și partener, calculate o singură dată per versiune de date și zi"""
+    return aging_summary(df, today=today, **DATASET_AGING[dataset])
+
+
+def load_aging(df, dataset, today):
+    """
+    Analiza pe vechimi (vezi DATASET_AGING) a cadrului `df` returnat de
+    loader-ul setului `dataset`, la data `today`. Pentru datele demo se
+    calculează pe loc.
+    """
+    if df.attrs.get('dataset') != dataset:
+        return aging_summary(df, today=today, **DATASET_AGING[dataset])
+    return _build_aging(df, dataset, df.attrs['data_version'], len(df), today)
+
+
+@versioned_derivation
+def _build_kpis(df, dataset, data_version, row_count):
+    """Indicatorii din antet, calculați o singură dată per versiune de date"""
+    return compute_kpis(df, **DATASET_KPIS.get(dataset, {}))
+
+
+def load_kpis(df, dataset=None):
+    """
+    Indicatorii (vezi DATASET_KPIS) ai cadrului `df` returnat de un loader.
+    Se materializează la încărcarea fiecărei versiuni (warm-up și reîncărcare),
+    astfel încât antetul paginilor doar îi citește. Pentru datele demo se
+    calculează pe loc, după definiția setului `dataset`.
+    """
+    loaded = df.attrs.get('dataset')
+    if loaded is None:
+        return compute_kpis(df, **DATASET_KPIS.get(dataset, {}))
+    return _build_kpis(df, loaded, df.attrs['data_version'], len(df))
+
+
+@st.cache_resource
+def get_sql_backend():
+    """Backend-ul SQL încorporat al procesului, sau None dacă DuckDB lipsește"""
+    return SqlBackend() if duckdb is not None else None
+
+
+def query_aggregate(df, by, measures, filters=(), dropna=True, count=None):
+    """
+    Suma coloanelor `measures` pe dimensiunile `by`, pentru rândurile care
+    trec de `filters` - listă de (coloană, operator, valoare), operatorii
+    fiind cei din utils.sql.FILTER_OPERATORS. Cu `count` se adaugă și
+    numărul de rânduri al fiecărui grup.
+
+    Cadrele returnate de loadere sunt interogate în backend-ul SQL (tabelul
+    poartă numele setului de date și este reînregistrat la o versiune nouă);
+    datele demo sau lipsa DuckDB duc la aceeași agregare în pandas.
+    """
+    dataset = df.attrs.get('dataset')
+    backend = get_sql_backend()
+    if dataset is None or backend is None:
+        return aggregate_frame(df, by, measures, filters, dropna, count)
+    token = (df.attrs['data_version'], len(df))
+    return backend.aggregate(dataset, token, df, by, measures, filters, dropna, count)
+
+
+class DataRefreshScheduler(threading.Thread):
+    """
+    Urmărește fișierele din data/ și pregătește în fundal versiunea nouă a
+    setului de date al cărui fișier a fost înlocuit: parsarea (într-un proces
+    separat, ca să nu țină GIL-ul cererilor), indexurile și agregatele, apoi
+    publicarea atomică în depozit. Cererile nu așteaptă parsarea - până la
+    publicare văd versiunea anterioară.
+    """
+
+    def __init__(self, interval=DATA_WATCH_INTERVAL):
+        super().__init__(name="data-refresh-scheduler", daemon=True)
+        self.interval = interval
+        # Seturile nepublicate la pornire (fișier lipsă sau eroare) se reîncearcă la prima verificare
+        self.versions = {}
+        for dataset in DATA_FILES:
+            published = get_dataset_store().current(dataset)
+            self.versions[dataset] = published[0] if published is not None else None
+        self._pool = None
+
+    def _parse(self, dataset):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        future = self._pool.submit(
+            read_excel_snapshot, DATA_FILES[dataset], DATASET_COLUMNS.get(dataset), DATASET_SCHEMAS.get(dataset)
+        )
+        return future.result()
+
+    def refresh(self, dataset, version):
+        """Parsează, pregătește și publică versiunea `version` a setului de date"""
+        df = self._parse(dataset)
+        df.attrs['dataset'] = dataset
+        df.attrs['data_version'] = version
+        _prepare_dataset(df)
+        get_dataset_store().publish(dataset, version, df)
+
+    def poll(self):
+        """Verifică o dată toate fișierele; returnează seturile republicate"""
+        refreshed = []
+        for dataset, old_version in self.versions.items():
+            new_version = _file_version(dataset)
+            if new_version == old_version:
+                continue
+            if new_version == "missing":
+                get_dataset_store().discard(dataset)
+                derived_cache.discard(dataset)
+            else:
+                try:
+                    self.refresh(dataset, new_version)
+                except Exception:
+                    continue  # Fișier parțial scris - se reîncearcă la următoarea verificare
+            self.versions[dataset] = new_version
+            refreshed.append(dataset)
+        return refreshed
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            self.poll()
+
+
+@st.cache_resource
+def start_refresh_scheduler():
+    """Pornește (o singură dată per proces) reîmprospătarea în fundal a seturilor de date"""
+    scheduler = DataRefreshScheduler()
+    scheduler.start()
+    return scheduler
+
+
 def load_balanta_la_data():
     """Încarcă datele din Excel - Balanță la dată"""
     try:
-        df = pd.read_excel("data/LaData.xlsx")
+        df = load_dataset('balanta_la_data')
         return df
     except:
         return pd.DataFrame({
@@ -19,11 +382,10 @@ def load_balanta_la_data():
             'ValoareStocFinal': [5000]
         })
 
-@st.cache_data
 def load_balanta_perioada():
     """Încarcă datele din Excel - Balanță pe perioadă"""
     try:
-        df = pd.read_excel("data/Perioada.xlsx")
+        df = load_dataset('balanta_perioada')
         return df
     except:
         return pd.DataFrame({
@@ -35,18 +397,17 @@ def load_balanta_perioada():
 
 
 
-@st.cache_data
 def load_neachitate():
     """Încarcă datele din Excel - Facturi Neachitate"""
     try:
-        df = pd.read_excel("data/FacturiNeachitate.xlsx")
+        df = load_dataset('neachitate')
         return df
     except:
         return pd.DataFrame({
             'Furnizor': ['Furnizor Demo 1', 'Furnizor Demo 2'],
             'Numar': ['F001', 'F002'],
-            'Data': ['2024-01-01', '2024-01-02'],
-            'DataScadenta': ['2024-01-31', '2024-02-01'],
+            'Data': pd.to_datetime(['2024-01-01', '2024-01-02']),
+            'DataScadenta': pd.to_datetime(['2024-01-31', '2024-02-01']),
             'Total': [5000, 3000],
             'Sold': [5000, 1500],
             'Valuta': ['EUR', 'EUR'],
@@ -55,18 +416,17 @@ def load_neachitate():
         })
 
 
-@st.cache_data
 def load_neincasate():
     """Încarcă datele din Excel - Facturi Neîncasate"""
     try:
-        df = pd.read_excel("data/FacturiNeincasate.xlsx")
+        df = load_dataset('neincasate')
         return df
     except:
         return pd.DataFrame({
             'Client': ['Client Demo 1', 'Client Demo 2'],
             'Numar': ['F001', 'F002'],
-            'Data': ['2024-01-01', '2024-01-02'],
-            'DataScadenta': ['2024-01-31', '2024-02-01'],
+            'Data': pd.to_datetime(['2024-01-01', '2024-01-02']),
+            'DataScadenta': pd.to_datetime(['2024-01-31', '2024-02-01']),
             'Total': [5000, 3000],
             'Sold': [5000, 1500],
             'Valuta': ['RON', 'RON'],
@@ -75,18 +435,17 @@ def load_neincasate():
         })
 
 
-@st.cache_data
 def load_scadente_plati():
     """Încarcă datele din Excel - Scadențe Plăți Cu Efecte"""
     try:
-        df = pd.read_excel("data/ScadentePlatiCuEfecte.xlsx")
+        df = load_dataset('scadente_plati')
         return df
     except:
         return pd.DataFrame({
             'Beneficiar': ['Beneficiar Demo 1', 'Beneficiar Demo 2'],
             'Numar': ['E001', 'E002'],
-            'Data': ['2024-01-01', '2024-01-02'],
-            'DataScadenta': ['2024-01-31', '2024-02-01'],
+            'Data': pd.to_datetime(['2024-01-01', '2024-01-02']),
+            'DataScadenta': pd.to_datetime(['2024-01-31', '2024-02-01']),
             'Valoare': [10000, 15000],
             'Valuta': ['RON', 'RON'],
             'TipEfect': ['Cambie', 'Bilet la ordin'],
@@ -95,14 +454,51 @@ def load_scadente_plati():
 
 
 
+def load_cumparari_ciis():
+    """Încarcă datele din Excel - Cumpărări Intrări în Stoc (CIIS)"""
+    try:
+        df = load_dataset('cumparari_ciis')
+        return df
+    except:
+        return pd.DataFrame({
+            'Gestiune': ['Gestiune Demo 1', 'Gestiune Demo 2'],
+            'Denumire grupa': ['Grupa Demo 1', 'Grupa Demo 2'],
+            'Denumire': ['Produs Demo A', 'Produs Demo B'],
+            'UM': ['buc', 'buc'],
+            'Cantitate': [10, 5],
+            'Valoare': [1000, 500],
+            'Furnizor': ['Furnizor Demo 1', 'Furnizor Demo 2'],
+            'Serie': ['Demo1', 'Demo2'],
+            'Data': pd.to_datetime(['2024-07-01', '2024-07-02']),
+        })
+
+
+def load_cumparari_cipd():
+    """Încarcă datele din Excel - Cumpărări Intrări pe Documente (CIPD)"""
+    try:
+        df = load_dataset('cumparari_cipd')
+        return df
+    except:
+        return pd.DataFrame({
+            'Furnizor': ['Furnizor Demo 1', 'Furnizor Demo 2'],
+            'Data': pd.to_datetime(['2024-07-01', '2024-07-02']),
+            'Serie': ['Demo1', 'Demo2'],
+            'Grupa': ['Grupa Demo 1', 'Grupa Demo 2'],
+            'Denumire': ['Produs Demo A', 'Produs Demo B'],
+            'UM': ['buc', 'buc'],
+            'Cantitate': [10, 5],
+            'Valoare': [1000, 500],
+            'Discount': [0, 25],
+            'Gestiune': ['Gestiune Demo 1', 'Gestiune Demo 2'],
+        })
+
 
-@st.cache_data
 def load_vanzari():
     """Încarcă datele din Excel - Vânzări"""
     try:
-        df = pd.read_excel("data/VS.xlsx")
+        df = load_dataset('vanzari')
+
 
-        
         return df
     except Exception as e:
         # Date demo în caz de eroare
@@ -118,8 +514,3 @@ def load_vanzari():
             'Cod': ['P001', 'P002', 'P003'],
             'UM': ['buc', 'buc', 'buc']
         })
-
-
-
-
-# TODO: Adăugare alte funcții load_* pentru celelalte pagini
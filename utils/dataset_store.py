@@ -0,0 +1,118 @@
+"""
+Depozitul de seturi de date al procesului, partajat de toate sesiunile.
+
+Fiecare set de date este parsat o singură dată per versiune (single-flight):
+sesiunile care cer aceeași versiune în timpul parsării o așteaptă pe prima,
+în loc să parseze la rândul lor. Depozitul păstrează un singur cadru per
+set de date - versiunea nouă o înlocuiește pe cea veche -, iar apelanții
+primesc vederi ale lui, nu copii, astfel încât memoria nu crește cu
+numărul de sesiuni.
+
+Versiunile noi sunt pregătite în afara cererilor (vezi DataRefreshScheduler
+în utils/data_loaders.py) și publicate atomic cu publish(); o rulare care
+a luat un snapshot() continuă cu versiunile de la începutul ei.
+"""
+
+import threading
+from collections import Counter
+from datetime import datetime
+
+
+def read_only_view(df):
+    """
+    O vedere a cadrului partajat: coloanele proprii, datele comune. Cu
+    copy-on-write (implicit din pandas 3, de aceea pandas>=3.0 în
+    requirements.txt), o scriere în vedere copiază doar coloana modificată,
+    iar coloanele adăugate rămân în vedere - cadrul din depozit nu se schimbă.
+    """
+    return df.copy(deep=False)
+
+
+class _Flight:
+    """O încărcare în curs, așteptată de toți apelanții aceleiași versiuni"""
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class DatasetStore:
+    """
+    Cadrele publicate, pe set de date - (versiune, cadru, momentul
+    publicării) - și încărcările în curs. `loads` numără cadrele publicate
+    pe set de date.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = {}
+        self._flights = {}
+        self.loads = Counter()
+
+    def publish(self, dataset, version, df):
+        """Înlocuiește atomic cadrul setului de date cu versiunea nouă, deja încărcată"""
+        with self._lock:
+            self._loaded[dataset] = (version, df, datetime.now())
+            self.loads[dataset] += 1
+
+    def current(self, dataset):
+        """Versiunea publicată a setului de date - (versiune, cadru, moment) - sau None"""
+        with self._lock:
+            return self._loaded.get(dataset)
+
+    def snapshot(self):
+        """Toate versiunile publicate în acest moment, pe set de date"""
+        with self._lock:
+            return dict(self._loaded)
+
+    def get(self, dataset, version, load):
+        """
+        Vederea versiunii `version` a setului `dataset`. load() rulează doar
+        dacă versiunea nu este nici încărcată, nici în curs de încărcare; o
+        eroare a ei ajunge la toți apelanții care au așteptat-o, iar
+        următorul apel reîncearcă.
+        """
+        with self._lock:
+            loaded = self._loaded.get(dataset)
+            if loaded is not None and loaded[0] == version:
+                return read_only_view(loaded[1])
+            flight = self._flights.get((dataset, version))
+            leader = flight is None
+            if leader:
+                flight = self._flights[(dataset, version)] = _Flight()
+
+        if leader:
+            try:
+                flight.value = load()
+            except BaseException as exc:
+                flight.error = exc
+            with self._lock:
+                # Publicarea și încheierea încărcării sub același lock - un apelant
+                # nou găsește fie încărcarea în curs, fie cadrul publicat
+                del self._flights[(dataset, version)]
+                if flight.error is None:
+                    self._loaded[dataset] = (version, flight.value, datetime.now())
+                    self.loads[dataset] += 1
+            flight.done.set()
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return read_only_view(flight.value)
+
+    def discard(self, dataset):
+        """Scoate setul de date din depozit (ex. fișierul a fost șters)"""
+        with self._lock:
+            self._loaded.pop(dataset, None)
+
+    def stats(self):
+        """Versiunile publicate, momentul publicării și numărul de încărcări, pe set de date"""
+        with self._lock:
+            return {
+                dataset: {'version': version, 'rows': len(df), 'refreshed_at': refreshed, 'loads': self.loads[dataset]}
+                for dataset, (version, df, refreshed) in self._loaded.items()
+            }
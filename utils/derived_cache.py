@@ -0,0 +1,157 @@
+"""
+Cache pentru calculele derivate din seturile de date (metrici, grafice).
+
+Cheia este amprenta ieftină a calculului - versiunea datelor și descrierea
+normalizată a filtrelor -, nu conținutul DataFrame-ului, care nu este
+hash-uit niciodată. Rezultatele dependente de filtre sunt într-un LRU
+limitat; structurile construite o dată per versiune de date stau separat,
+pe set de date, ca să nu fie eliminate de combinațiile de filtre.
+"""
+
+import functools
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+
+from utils.constants import DERIVED_CACHE_MAX_ENTRIES, DERIVED_CACHE_VERSIONS
+
+
+def normalize_filters(value):
+    """
+    Forma canonică (hashable) a stării filtrelor: dicționare cu chei sortate,
+    selecții (liste, seturi) fără ordine, date ISO. Tuplurile își păstrează
+    ordinea - un interval (început, sfârșit) nu este o selecție.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), normalize_filters(item)) for key, item in value.items()))
+    if isinstance(value, (list, set, frozenset, np.ndarray)):
+        return tuple(sorted((normalize_filters(item) for item in value), key=repr))
+    if isinstance(value, tuple):
+        return tuple(normalize_filters(item) for item in value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class DerivedCache:
+    """
+    Rezultatele calculelor derivate, partajate de toate sesiunile procesului,
+    cu eliminarea celor folosite cel mai demult peste `max_entries` și
+    contoare de hit/miss pe fiecare funcție. Structurile per versiune
+    (get_or_build_version) păstrează ultimele `max_versions` versiuni ale
+    fiecărui set de date, independent de LRU.
+    """
+
+    def __init__(self, max_entries, max_versions=DERIVED_CACHE_VERSIONS):
+        self.max_entries = max_entries
+        self.max_versions = max_versions
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, name, key, compute):
+        with self._lock:
+            counts = self._counts.setdefault(name, [0, 0])
+            if (name, key) in self._entries:
+                self._entries.move_to_end((name, key))
+                counts[0] += 1
+                return self._entries[(name, key)]
+            counts[1] += 1
+
+        result = compute()
+        with self._lock:
+            self._entries[(name, key)] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def get_or_build_version(self, name, dataset, key, build):
+        """
+        Structura `name` a setului `dataset` pentru cheia `key` (versiunea
+        datelor); o versiune nouă o elimină pe cea mai veche peste `max_versions`.
+        """
+        with self._lock:
+            counts = self._counts.setdefault(name, [0, 0])
+            versions = self._versions.setdefault((name, dataset), OrderedDict())
+            if key in versions:
+                versions.move_to_end(key)
+                counts[0] += 1
+                return versions[key]
+            counts[1] += 1
+
+        result = build()
+        with self._lock:
+            versions = self._versions.setdefault((name, dataset), OrderedDict())
+            versions[key] = result
+            while len(versions) > self.max_versions:
+                versions.popitem(last=False)
+        return result
+
+    def discard(self, dataset):
+        """Scoate structurile per versiune ale setului de date (ex. fișierul a fost șters)"""
+        with self._lock:
+            for name, owner in [item for item in self._versions if item[1] == dataset]:
+                del self._versions[(name, owner)]
+
+    def stats(self):
+        """Hit-urile și miss-urile pe funcție, plus numărul de intrări (LRU și per versiune)"""
+        with self._lock:
+            functions = {name: {'hits': hits, 'misses': misses} for name, (hits, misses) in self._counts.items()}
+            return {
+                'hits': sum(item['hits'] for item in functions.values()),
+                'misses': sum(item['misses'] for item in functions.values()),
+                'entries': len(self._entries),
+                'versions': sum(len(versions) for versions in self._versions.values()),
+                'functions': functions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+derived_cache = DerivedCache(DERIVED_CACHE_MAX_ENTRIES)
+
+
+def cached_derivation(func):
+    """
+    Memorează o funcție f(df, ...) în `derived_cache`. Primul argument
+    (cadrul) nu face parte din cheie: celelalte argumente trebuie să descrie
+    complet rezultatul - versiunea datelor și filtrele aplicate - și sunt
+    normalizate ca filtrele (listele sunt selecții fără ordine; argumentele
+    a căror ordine contează se dau ca tupluri). Rezultatele sunt partajate,
+    deci nu trebuie modificate pe loc.
+    """
+    # Paginile rulează toate ca __main__, deci numele include fișierul sursă
+    name = f"{os.path.basename(func.__code__.co_filename)}:{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(df, *args, **kwargs):
+        key = normalize_filters((args, kwargs))
+        return derived_cache.get_or_compute(name, key, lambda: func(df, *args, **kwargs))
+
+    return wrapper
+
+
+def versioned_derivation(func):
+    """
+    Memorează o funcție f(df, dataset, data_version, ...) care construiește o
+    structură o singură dată per versiune de date (indexuri, cub, ierarhie).
+    Rezultatele nu intră în LRU-ul rezultatelor filtrate: se păstrează
+    ultimele versiuni ale fiecărui set de date (vezi DerivedCache).
+    """
+    name = f"{os.path.basename(func.__code__.co_filename)}:{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(df, dataset, *args, **kwargs):
+        key = normalize_filters((args, kwargs))
+        return derived_cache.get_or_build_version(name, dataset, key, lambda: func(df, dataset, *args, **kwargs))
+
+    return wrapper
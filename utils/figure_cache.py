@@ -0,0 +1,58 @@
+"""
+Cache LRU pentru figurile Plotly deja construite
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+
+class FigureCache:
+    """
+    Figurile serializate (JSON), pe cheia (grafic, versiune date, filtre), cu
+    un buget de memorie: la depășire se elimină figurile folosite cel mai
+    demult. Instanța este partajată de toate sesiunile procesului.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Specificația figurii (dict) sau None dacă nu este în cache"""
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(spec)
+
+    def put(self, key, spec):
+        """Adaugă figura serializată `spec`, eliminând la nevoie cele mai vechi"""
+        size = len(spec)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = spec
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def get_or_build(self, key, build):
+        """Figura din cache sau, la prima cerere, cea construită de build()"""
+        spec = self.get(key)
+        if spec is not None:
+            return spec
+        fig = build()
+        self.put(key, fig.to_json())
+        return fig
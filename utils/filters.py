@@ -0,0 +1,114 @@
+"""
+Motor de filtrare comun pentru pagini
+"""
+
+from datetime import timedelta
+
+import numpy as np
+
+
+class FrameFilter:
+    """
+    Compune filtre peste un DataFrame din cache fără copii intermediare.
+
+    Selecția curentă este fie o felie contiguă de rânduri (`slice`), fie un
+    array sortat de poziții. Intervalele pe coloana de sortare se rezolvă
+    prin căutare binară, filtrele pe dimensiuni indexate (vezi
+    utils/indexes.py) prin reuniune și intersecție de poziții, iar restul se
+    evaluează doar pe rândurile deja selectate - costul scade odată cu
+    numărul de rânduri care se potrivesc.
+    Abia `result()` materializează felia finală, doar cu coloanele cerute.
+    DataFrame-ul sursă nu este modificat niciodată, iar fără filtre active
+    este returnat ca atare - paginile nu trebuie să modifice rezultatul pe loc.
+    """
+
+    def __init__(self, df, indexes=None):
+        self.df = df
+        self.indexes = indexes or {}
+        self._positions = None
+
+    def _intersect(self, positions):
+        if self._positions is None:
+            self._positions = positions
+        elif isinstance(self._positions, slice):
+            lo, hi = self._positions.start, self._positions.stop
+            self._positions = positions[np.searchsorted(positions, lo):np.searchsorted(positions, hi)]
+        else:
+            self._positions = np.intersect1d(self._positions, positions, assume_unique=True)
+        return self
+
+    def _intersect_range(self, lo, hi):
+        if self._positions is None:
+            self._positions = slice(lo, hi)
+        elif isinstance(self._positions, slice):
+            self._positions = slice(max(lo, self._positions.start), max(min(hi, self._positions.stop), lo))
+        else:
+            positions = self._positions
+            self._positions = positions[np.searchsorted(positions, lo):np.searchsorted(positions, hi)]
+        return self
+
+    def _where(self, column, predicate):
+        """Restrânge selecția la rândurile pentru care predicate(valori) este True"""
+        series = self.df[column]
+        if self._positions is None:
+            self._positions = np.flatnonzero(predicate(series))
+        elif isinstance(self._positions, slice):
+            lo = self._positions.start
+            self._positions = lo + np.flatnonzero(predicate(series.iloc[self._positions]))
+        else:
+            self._positions = self._positions[predicate(series.iloc[self._positions])]
+        return self
+
+    def isin(self, column, values):
+        """Păstrează rândurile cu una dintre valorile selectate (selecție goală = fără filtru)"""
+        if column not in self.df.columns or len(values) == 0:
+            return self
+        if column in self.indexes:
+            return self._intersect(self.indexes[column].positions(values))
+        return self._where(column, lambda s: s.isin(values).to_numpy())
+
+    def equals(self, column, value):
+        """Păstrează rândurile în care coloana are exact valoarea dată"""
+        if column not in self.df.columns:
+            return self
+        if column in self.indexes:
+            return self._intersect(self.indexes[column].positions([value]))
+        return self._where(column, lambda s: (s == value).to_numpy())
+
+    def date_between(self, column, start_date, end_date):
+        """Păstrează rândurile cu data (fără oră) în intervalul închis [start_date, end_date]"""
+        if column not in self.df.columns:
+            return self
+        start = np.datetime64(start_date, 'D')
+        stop = np.datetime64(end_date + timedelta(days=1), 'D')
+        if column in self.indexes:
+            return self._intersect_range(*self.indexes[column].range(start, stop))
+
+        def predicate(s):
+            values = s.to_numpy()
+            return (values >= start) & (values < stop)
+
+        return self._where(column, predicate)
+
+    def days_in(self, column, days):
+        """Păstrează rândurile a căror dată (fără oră) este una dintre zilele selectate"""
+        if column not in self.df.columns or len(days) == 0:
+            return self
+        days = np.asarray(days, dtype='datetime64[D]')
+        return self._where(column, lambda s: np.isin(s.to_numpy().astype('datetime64[D]'), days))
+
+    @property
+    def is_active(self):
+        """True dacă cel puțin un filtru a restrâns selecția"""
+        return self._positions is not None
+
+    def result(self, columns=None):
+        """Materializează o singură dată felia filtrată, opțional proiectată pe `columns`"""
+        if columns is not None:
+            columns = [col for col in columns if col in self.df.columns]
+        if self._positions is None:
+            return self.df if columns is None else self.df[columns]
+        # Pentru o felie contiguă (slice) iloc nu copiază rândurile
+        if columns is None:
+            return self.df.iloc[self._positions]
+        return self.df.iloc[self._positions, self.df.columns.get_indexer(columns)]
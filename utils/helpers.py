@@ -1 +1,265 @@
 # Funcții helper generale
+
+import math
+import os
+
+import numpy as np
+import plotly.express as px
+import streamlit as st
+
+from utils.aging import AGING_COLUMN
+from utils.charts import hierarchy_arrays
+from utils.constants import (
+    DATA_FILES, FIGURE_CACHE_MAX_BYTES, PROFILE_ENV_VAR, PROFILE_QUERY_PARAM, TABLE_PAGE_SIZE, TIMING_QUERY_PARAM,
+)
+from utils.derived_cache import cached_derivation, derived_cache, normalize_filters
+from utils.figure_cache import FigureCache
+from utils.timing import span
+
+
+@st.cache_resource
+def get_figure_cache():
+    """Cache-ul de figuri al procesului (vezi utils/figure_cache.py)"""
+    return FigureCache(FIGURE_CACHE_MAX_BYTES)
+
+
+def cached_figure(chart_id, data_version, filters, build):
+    """
+    Figura `chart_id` pentru versiunea datelor și starea filtrelor date.
+    build() - agregările și construcția Plotly - rulează doar la prima
+    combinație; apoi figura vine din cache, ca specificație pentru st.plotly_chart.
+    """
+    key = (chart_id, data_version, normalize_filters(filters))
+    with span(f"figură {chart_id}"):
+        return get_figure_cache().get_or_build(key, build)
+
+
+@cached_derivation
+def hierarchy_chart_data(df, levels, value, customdata, data_version, filters=None, root=None):
+    """
+    Vectorii unui grafic ierarhic (vezi utils/charts.py). Cheia cache-ului
+    este versiunea datelor + filtrele + structura ierarhiei, nu conținutul
+    DataFrame-ului.
+    """
+    return hierarchy_arrays(df, list(levels), value, list(customdata), root)
+
+
+def _presorted_positions(series, ascending):
+    """
+    Ordinea sortării fără sortare, când coloana este deja monotonă (valorile
+    lipsă la final): pozițiile în ordine sau inversate. None altfel.
+    """
+    present = int(series.notna().sum())
+    values = series.iloc[:present]
+    if present < len(series) and values.isna().any():
+        return None
+    if values.is_monotonic_increasing:
+        reverse = not ascending
+    elif values.is_monotonic_decreasing:
+        reverse = ascending
+    else:
+        return None
+    positions = np.arange(len(series))
+    if reverse:
+        positions[:present] = positions[:present][::-1].copy()
+    return positions
+
+
+def _sorted_positions(series, ascending):
+    """Pozițiile rândurilor în ordinea sortării coloanei (valorile lipsă la final)"""
+    ordered = series.reset_index(drop=True).sort_values(
+        ascending=ascending, kind='stable', na_position='last'
+    )
+    return ordered.index.to_numpy()
+
+
+@cached_derivation
+def _cached_sort_positions(series, table, cache_key, ascending):
+    """Ordinea sortării unui tabel, per versiune de date, filtre și coloană (vezi paginated_table)"""
+    return _sorted_positions(series, ascending)
+
+
+def paginated_table(df, key, page_size=TABLE_PAGE_SIZE, default_sort=None, column_config=None, height=None,
+                    cache_key=None):
+    """
+    Afișează `df` paginat: datele rămân pe server și browserului i se trimite
+    doar pagina curentă, cu coloanele alese. Sortarea se face pe server, pe
+    o singură coloană (doar pozițiile rândurilor), fără a copia cadrul: o
+    coloană deja ordonată doar se inversează, altfel ordinea se memorează
+    dacă `cache_key` - (versiunea datelor, filtrele) - descrie complet `df`.
+
+    `default_sort` este un tuplu (coloană, crescător). Totalurile se calculează
+    de către pagină pe întregul set filtrat, nu pe pagina afișată.
+    """
+    columns = list(df.columns)
+    control_cols = st.columns([3, 2, 1, 1])
+
+    with control_cols[0]:
+        shown_columns = st.multiselect(
+            "Coloane afișate:", options=columns, default=columns, key=f"{key}_columns"
+        ) or columns
+
+    sort_options = ['—'] + columns
+    default_column, default_ascending = default_sort or ('—', True)
+    with control_cols[1]:
+        sort_column = st.selectbox(
+            "Sortare după:", options=sort_options,
+            index=sort_options.index(default_column) if default_column in sort_options else 0,
+            key=f"{key}_sort"
+        )
+    with control_cols[2]:
+        descending = st.toggle("Descrescător", value=not default_ascending, key=f"{key}_desc")
+
+    total_rows = len(df)
+    page_count = max(1, math.ceil(total_rows / page_size))
+    # Numărul paginii rămâne valid când filtrele reduc numărul de rânduri
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+    with control_cols[3]:
+        page = st.number_input(
+            f"Pagina (din {page_count}):", min_value=1, max_value=page_count, step=1, key=page_key
+        )
+
+    start = (page - 1) * page_size
+    stop = min(start + page_size, total_rows)
+    column_positions = df.columns.get_indexer(shown_columns)
+    if sort_column != '—':
+        positions = _presorted_positions(df[sort_column], ascending=not descending)
+        if positions is None and cache_key is not None and cache_key[0] is not None:
+            positions = _cached_sort_positions(df[sort_column], key, (cache_key, sort_column), not descending)
+        elif positions is None:
+            positions = _sorted_positions(df[sort_column], ascending=not descending)
+        page_df = df.iloc[positions[start:stop], column_positions]
+    else:
+        page_df = df.iloc[start:stop, column_positions]
+
+    size = {} if height is None else {'height': height}
+    with span(f"tabel {key}"):
+        st.dataframe(page_df, use_container_width=True, column_config=column_config, **size)
+    if total_rows:
+        st.caption(f"Rândurile {start + 1:,}–{stop:,} din {total_rows:,}")
+    return page_df
+
+
+def render_aging(aging, counterparty, measure, key, selected=None):
+    """
+    Afișează analiza pe vechimi (vezi utils/aging.py): suma `measure` pe
+    intervale și tabelul partenerilor pe intervale. `selected` restrânge
+    rezultatul la partenerii filtrați în pagină.
+    """
+    if aging.empty or measure not in aging.columns:
+        st.info("Nu există date pentru analiza pe vechimi.")
+        return
+    if selected:
+        aging = aging[aging[counterparty].isin(selected)]
+
+    per_bucket = aging.groupby(AGING_COLUMN, observed=False)[[measure, 'Documente']].sum().reset_index()
+    fig = px.bar(
+        per_bucket,
+        x=AGING_COLUMN,
+        y=measure,
+        text_auto=',.0f',
+        hover_data=['Documente'],
+        title=f"{measure} pe intervale de vechime"
+    )
+    fig.update_layout(height=400)
+    st.plotly_chart(fig, use_container_width=True)
+
+    pivot = aging.pivot_table(
+        index=counterparty, columns=AGING_COLUMN, values=measure,
+        aggfunc='sum', observed=True, fill_value=0
+    )
+    pivot.columns = pivot.columns.astype(str)
+    pivot['Total'] = pivot.sum(axis=1)
+    pivot = pivot.sort_values('Total', ascending=False).reset_index()
+    paginated_table(pivot, key=key)
+
+
+def _is_on(value):
+    return value not in (None, '', '0', 'false')
+
+
+def session_flag(param):
+    """
+    Opțiunea de depanare `param` pentru sesiunea curentă: pornită cu ?param=1
+    în URL (oprită cu ?param=0) și păstrată în sesiune, deoarece navigarea
+    între pagini golește parametrii.
+    """
+    value = st.query_params.get(param)
+    if value is not None:
+        st.session_state[f'_{param}'] = _is_on(value)
+    return st.session_state.get(f'_{param}', False)
+
+
+def timing_enabled():
+    """Măsurarea duratelor pe faze (vezi utils/timing.py), cu ?timing=1"""
+    return session_flag(TIMING_QUERY_PARAM)
+
+
+def profiling_enabled():
+    """
+    Profilarea rulării curente (vezi utils/profiling.py). ?profile=1 profilează
+    o singură rulare: parametrul se scoate din URL, iar rulările următoare
+    (widget-uri, navigare) nu mai scriu profiluri. BRENADO_PROFILE=1 le profilează pe toate.
+    """
+    if PROFILE_QUERY_PARAM in st.query_params:
+        value = st.query_params[PROFILE_QUERY_PARAM]
+        del st.query_params[PROFILE_QUERY_PARAM]
+        if _is_on(value):
+            return True
+    return _is_on(os.environ.get(PROFILE_ENV_VAR))
+
+
+def filter_state():
+    """Valorile widget-urilor din sesiune (filtrele paginii), pentru jurnalul de durate"""
+    return {key: value for key, value in st.session_state.items() if not key.startswith('_')}
+
+
+def render_timings(record):
+    """
+    Bara laterală de depanare cu span-urile ultimei rulări (vezi utils/timing.py)
+    și contoarele cache-ului de calcule derivate
+    """
+    with st.sidebar:
+        st.markdown(f"**⏱️ Durate rulare: {record['total_ms']:,.0f} ms**")
+        st.dataframe(
+            [
+                {'Fază': "\u2003" * item['depth'] + item['name'], 'ms': item['duration_ms']}
+                for item in record['spans']
+            ],
+            column_config={'ms': st.column_config.NumberColumn(format="%.1f")},
+            hide_index=True,
+            use_container_width=True
+        )
+        stats = derived_cache.stats()
+        with st.expander(
+            f"🗃️ Cache derivate: {stats['hits']:,} hit / {stats['misses']:,} miss · "
+            f"{stats['entries']} filtrate, {stats['versions']} per versiune"
+        ):
+            st.dataframe(
+                [
+                    {'Funcție': name, 'hit': counts['hits'], 'miss': counts['misses']}
+                    for name, counts in sorted(stats['functions'].items())
+                ],
+                hide_index=True,
+                use_container_width=True
+            )
+
+
+def render_data_status(snapshot):
+    """
+    Bara laterală cu versiunea și momentul actualizării fiecărui set de date
+    văzut de rularea curentă (vezi dataset_snapshot în utils/data_loaders.py)
+    """
+    published = {dataset: entry for dataset, entry in snapshot.items() if entry is not None}
+    if not published:
+        return
+    latest = max(refreshed for _, _, refreshed in published.values())
+    st.sidebar.caption(f"🔄 Date actualizate la {latest:%d/%m/%Y %H:%M:%S}")
+    with st.sidebar.expander("Versiuni date"):
+        for dataset, (version, df, refreshed) in sorted(published.items()):
+            st.caption(
+                f"**{os.path.basename(DATA_FILES[dataset])}** · v{version.rsplit('-', 1)[-1][:8]} · "
+                f"{len(df):,} rânduri · {refreshed:%d/%m %H:%M:%S}"
+            )
@@ -0,0 +1,60 @@
+"""
+Ierarhii de dimensiuni pentru filtrele în cascadă (ex. gestiune -> producător -> produs)
+"""
+
+import pandas as pd
+
+
+class DimensionHierarchy:
+    """
+    Tabele de lookup cu valorile distincte ale fiecărui nivel, pe părinți.
+
+    Se construiește o singură dată din combinațiile distincte ale nivelurilor;
+    opțiunile unui nivel se obțin apoi direct din părinții selectați, fără a
+    scana rândurile setului de date.
+    """
+
+    def __init__(self, df, levels):
+        self.levels = [level for level in levels if level in df.columns]
+        self._children = {}
+
+        paths = df[self.levels].drop_duplicates()
+        for path in paths.itertuples(index=False, name=None):
+            for depth, value in enumerate(path):
+                if pd.isna(value):
+                    break
+                self._children.setdefault(path[:depth], set()).add(value)
+
+        # Per coloană, nu din arbore: valorile unui nivel al cărui părinte lipsește (NaN) rămân filtrabile
+        self._distinct = {level: sorted(paths[level].dropna().unique()) for level in self.levels}
+
+    def distinct(self, level):
+        """Toate valorile distincte ale unui nivel (pentru filtre independente)"""
+        return self._distinct.get(level, [])
+
+    def options(self, level, selections):
+        """
+        Opțiunile pentru `level`, date fiind selecțiile nivelurilor superioare
+        (`selections`: nivel -> listă de valori; listă goală = toate).
+        """
+        if level not in self.levels:
+            return []
+        depth = self.levels.index(level)
+        parent_levels = self.levels[:depth]
+        if not any(selections.get(parent) for parent in parent_levels):
+            return self._distinct[level]
+
+        parents = [()]
+        for parent_level in parent_levels:
+            selected = set(selections.get(parent_level) or ())
+            parents = [
+                parent + (child,)
+                for parent in parents
+                for child in self._children.get(parent, ())
+                if not selected or child in selected
+            ]
+
+        values = set()
+        for parent in parents:
+            values.update(self._children.get(parent, ()))
+        return sorted(values)
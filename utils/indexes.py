@@ -0,0 +1,84 @@
+"""
+Indexuri inversate pentru dimensiunile folosite în filtrele multiselect
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class DimensionIndex:
+    """
+    Index inversat al unei coloane: valoare -> pozițiile (int32, sortate)
+    rândurilor care o conțin.
+
+    Pozițiile tuturor valorilor sunt ținute într-un singur array, grupate pe
+    codul categoriei; `offsets` delimitează grupul fiecărei valori.
+    """
+
+    def __init__(self, series):
+        categorical = series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+        codes = categorical.cat.codes.to_numpy()
+        categories = categorical.cat.categories
+
+        # Sortare stabilă pe cod => în fiecare grup pozițiile rămân crescătoare
+        order = np.argsort(codes, kind='stable').astype(np.int32)
+        missing = int(np.count_nonzero(codes < 0))
+        counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+
+        self.size = len(codes)
+        self._positions = order[missing:]
+        self._offsets = np.concatenate(([0], np.cumsum(counts)))
+        self._codes = {value: code for code, value in enumerate(categories)}
+
+    def positions(self, values):
+        """Pozițiile sortate ale rândurilor care au una dintre valori (reuniune)"""
+        # Pe coduri distincte - o valoare repetată în selecție nu își dublează rândurile
+        codes = dict.fromkeys(self._codes.get(value) for value in values)
+        codes.pop(None, None)
+        groups = [self._positions[self._offsets[code]:self._offsets[code + 1]] for code in codes]
+        if not groups:
+            return np.empty(0, dtype=np.int32)
+        if len(groups) == 1:
+            return groups[0]
+        # Grupurile sunt disjuncte, deci reuniunea este concatenare + sortare
+        return np.sort(np.concatenate(groups))
+
+
+class SortedIndex:
+    """
+    Index pe coloana de date după care setul este sortat crescător (NaT la final).
+
+    Un interval de date se rezolvă prin două căutări binare într-o felie
+    contiguă de rânduri, fără conversii pe fiecare rând.
+    """
+
+    def __init__(self, series):
+        values = series.to_numpy()
+        valid = int(np.count_nonzero(~np.isnat(values)))
+        self._values = values[:valid]
+        if np.isnat(self._values).any() or (self._values[1:] < self._values[:-1]).any():
+            raise ValueError(f"Coloana {series.name!r} nu este sortată crescător")
+        self.size = len(values)
+
+    def range(self, start, stop):
+        """Felia [lo, hi) a rândurilor cu start <= valoare < stop"""
+        lo = int(np.searchsorted(self._values, start, side='left'))
+        hi = int(np.searchsorted(self._values, stop, side='left'))
+        return lo, hi
+
+    def bounds(self):
+        """Prima și ultima dată (Timestamp), sau (None, None) dacă nu există date"""
+        if len(self._values) == 0:
+            return None, None
+        return pd.Timestamp(self._values[0]), pd.Timestamp(self._values[-1])
+
+
+def build_indexes(df, columns, sorted_column=None):
+    """
+    Construiește indexurile inversate pentru coloanele existente din `columns`
+    și, dacă setul este sortat după `sorted_column`, indexul de interval pe ea.
+    """
+    indexes = {col: DimensionIndex(df[col]) for col in columns if col in df.columns}
+    if sorted_column in df.columns:
+        indexes[sorted_column] = SortedIndex(df[sorted_column])
+    return indexes
@@ -0,0 +1,63 @@
+"""
+Indicatorii din antetul paginilor (KPI), materializați o dată per versiune de date
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class KpiSnapshot:
+    """
+    Indicatorii unui set de date: sume, numere de valori distincte și sume
+    pe zile, calculate la încărcarea versiunii. Citirea unui indicator este
+    o simplă căutare în dicționar, indiferent de dimensiunea setului; un
+    indicator al unei coloane lipsă valorează 0.
+    """
+
+    __slots__ = ('dataset', 'data_version', 'rows', '_totals', '_distinct', '_daily')
+
+    def __init__(self, dataset, data_version, rows, totals, distinct, daily):
+        self.dataset = dataset
+        self.data_version = data_version
+        self.rows = rows
+        self._totals = totals
+        self._distinct = distinct
+        self._daily = daily
+
+    def total(self, name):
+        """Suma unei coloane (sau a unui produs din `products`)"""
+        return self._totals.get(name, 0)
+
+    def distinct(self, column):
+        """Numărul de valori distincte (nenule) ale coloanei"""
+        return self._distinct.get(column, 0)
+
+    def on_day(self, column, day):
+        """Suma coloanei pe rândurile a căror dată (vezi `daily`) este `day`"""
+        return self._daily.get(column, {}).get(pd.Timestamp(day).date(), 0)
+
+
+def compute_kpis(df, sums=(), distinct=(), products=None, daily=None):
+    """
+    Calculează indicatorii cadrului `df`:
+    `sums` - coloane însumate, `distinct` - coloane numărate pe valori
+    distincte, `products` - nume -> (coloană, coloană) însumate ca produs,
+    `daily` - coloană -> coloana de dată după care se însumează pe zile.
+    """
+    totals = {col: float(df[col].sum()) for col in sums if col in df.columns}
+    for name, (left, right) in (products or {}).items():
+        if left in df.columns and right in df.columns:
+            totals[name] = float(np.nansum(df[left].to_numpy(dtype=float) * df[right].to_numpy(dtype=float)))
+
+    distinct_counts = {col: int(df[col].nunique()) for col in distinct if col in df.columns}
+
+    daily_sums = {}
+    for column, date_column in (daily or {}).items():
+        if column in df.columns and date_column in df.columns:
+            sums_by_day = df.groupby(df[date_column].dt.normalize())[column].sum()
+            daily_sums[column] = {day.date(): float(value) for day, value in sums_by_day.items()}
+
+    return KpiSnapshot(
+        df.attrs.get('dataset'), df.attrs.get('data_version'), len(df),
+        totals, distinct_counts, daily_sums,
+    )
@@ -0,0 +1,108 @@
+"""
+Comparații pe perioade: perioada curentă față de aceeași perioadă din anii
+anteriori, peste seria zilnică pre-agregată a unui set de date
+"""
+
+import pandas as pd
+
+# Perioadele „până la zi” calculate din data de referință
+PERIODS = ('week', 'month', 'quarter', 'ytd')
+
+# Alinierea perioadelor anterioare: aceeași dată calendaristică (ziua din
+# perioadă) sau aceeași zi a săptămânii ISO (52 de săptămâni pe an)
+ALIGN_DAY = 'day'
+ALIGN_WEEKDAY = 'weekday'
+
+
+def daily_series(df, date_column, value_column):
+    """Suma zilnică a coloanei `value_column`, indexată crescător după zi (zilele fără date lipsesc)"""
+    days = df[date_column].dt.normalize().rename(date_column)
+    return df[value_column].groupby(days).sum().sort_index()
+
+
+def period_bounds(period, anchor):
+    """Prima și ultima zi (inclusiv) a perioadei `period` (vezi PERIODS) care se încheie la `anchor`"""
+    end = pd.Timestamp(anchor).normalize()
+    if period == 'week':
+        start = end - pd.Timedelta(days=end.weekday())
+    elif period == 'month':
+        start = end.replace(day=1)
+    elif period == 'quarter':
+        start = end.replace(month=3 * ((end.month - 1) // 3) + 1, day=1)
+    elif period == 'ytd':
+        start = end.replace(month=1, day=1)
+    else:
+        raise ValueError(f"Perioadă necunoscută: {period!r}")
+    return start, end
+
+
+def prior_window(start, end, years, align=ALIGN_DAY):
+    """
+    Intervalul corespondent cu `years` ani în urmă. Aliniat pe zi, 29
+    februarie devine 28 februarie; aliniat pe ziua săptămânii, intervalul se
+    deplasează cu 52 de săptămâni pe an.
+    """
+    if align == ALIGN_WEEKDAY:
+        shift = pd.Timedelta(weeks=52 * years)
+        return start - shift, end - shift
+    if align != ALIGN_DAY:
+        raise ValueError(f"Aliniere necunoscută: {align!r}")
+    offset = pd.DateOffset(years=years)
+    return start - offset, end - offset
+
+
+def compare_periods(daily, start, end, years=(1,), align=ALIGN_DAY):
+    """
+    Punctele perioadei [start, end] și ale perioadelor corespondente cu
+    `years` ani în urmă, dintr-o serie zilnică sortată (vezi daily_series).
+
+    Rezultatul are câte un rând pe zi cu date: `AniInUrma` (0 = perioada
+    curentă), `Data` (ziua originală), `DataAliniata` (ziua corespondentă
+    din perioada curentă, pentru suprapunerea graficelor), `Zi` (ziua
+    aliniată din perioadă, de la 0) și `Valoare`. Aliniată pe zi, ziua
+    corespondentă este aceeași dată calendaristică (29 februarie devine 28
+    februarie), limitată la [start, end]. Fiecare perioadă este o felie a
+    seriei, aliniată vectorizat - fără parcurgerea rândurilor.
+    """
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    frames = []
+    for back in [0, *sorted(set(years))]:
+        lo, hi = (start, end) if back == 0 else prior_window(start, end, back, align)
+        window = daily.loc[lo:hi]
+        if back == 0:
+            aligned = window.index
+        elif align == ALIGN_WEEKDAY:
+            aligned = window.index + pd.Timedelta(weeks=52 * back)
+        else:
+            aligned = window.index + pd.DateOffset(years=back)
+        aligned = pd.Series(aligned).clip(start, end)
+        frames.append(pd.DataFrame({
+            'AniInUrma': back,
+            'Data': window.index,
+            'Zi': (aligned - start).dt.days.to_numpy(),
+            'DataAliniata': aligned.to_numpy(),
+            'Valoare': window.to_numpy(),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def period_summary(comparison, start, end, years=(1,), align=ALIGN_DAY):
+    """
+    Totalul, media zilnică, numărul de zile cu date și cea mai bună zi ale
+    fiecărei perioade din `compare_periods`, cu intervalul ei (`Start`, `End`).
+    """
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    backs = [0, *sorted(set(years))]
+    grouped = comparison.groupby('AniInUrma')['Valoare']
+    summary = pd.DataFrame({
+        'Total': grouped.sum(),
+        'Medie': grouped.mean(),
+        'Zile': grouped.size(),
+        'MaximZi': grouped.max(),
+    }).reindex(backs)
+    # O perioadă fără date are totalul, media și cea mai bună zi 0
+    summary = summary.fillna(0).astype({'Zile': int})
+    windows = [(start, end) if back == 0 else prior_window(start, end, back, align) for back in backs]
+    summary['Start'] = [lo for lo, _ in windows]
+    summary['End'] = [hi for _, hi in windows]
+    return summary
@@ -0,0 +1,117 @@
+"""
+Profilarea unei rulări de pagină, fără dependențe de Streamlit.
+
+Rularea se execută sub cProfile (statistici pe funcții, fișier pstats), iar
+un fir separat eșantionează stiva firului profilat la interval fix, pentru
+un fișier de stive colapsate ("a;b;c N") citit direct de flamegraph.pl,
+speedscope sau inferno. Fișierele sunt etichetate cu pagina și starea filtrelor.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter
+from datetime import datetime
+
+
+class StackSampler:
+    """
+    Eșantionează stiva firului `thread_id` la fiecare `interval` secunde,
+    numărând stivele identice. Stiva se taie la cadrul `root`, ca profilul
+    să conțină doar rularea paginii, nu și serverul Streamlit.
+    """
+
+    def __init__(self, thread_id, root, interval):
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame is not self.root:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def collapsed(self):
+        """Stivele în formatul colapsat, câte o linie "cadru;cadru;... număr" """
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items()))
+
+
+def _slug(text):
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_').lower() or "pagina"
+
+
+def profile_call(func, directory, page, filters=None, interval=0.005):
+    """
+    Rulează func() profilat și scrie în `directory`, cu prefixul
+    <dată>_<pagină>: profilul cProfile (.prof, pentru pstats/snakeviz),
+    primele funcții după timpul cumulat (.txt), stivele eșantionate (.collapsed)
+    și eticheta rulării - pagina, filtrele, durata (.json).
+
+    Fișierele se scriu și dacă rularea se oprește cu o excepție (ex. st.stop
+    sau o nouă rulare), pentru partea executată. Întoarce prefixul fișierelor.
+    """
+    os.makedirs(directory, exist_ok=True)
+    prefix = os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S-%f}_{_slug(page)}")
+
+    sampler = StackSampler(threading.get_ident(), sys._getframe(), interval)
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    sampler.start()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Un alt profiler este deja activ (Python 3.12+) - rămân doar eșantioanele
+        profiler = None
+    try:
+        func()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        sampler.stop()
+        duration = time.perf_counter() - started
+        _write_profile(prefix, profiler, sampler, page, filters, duration, interval)
+    return prefix
+
+
+def _write_profile(prefix, profiler, sampler, page, filters, duration, interval):
+    if profiler is not None:
+        profiler.dump_stats(prefix + ".prof")
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(40)
+        with open(prefix + ".txt", 'w', encoding='utf-8') as handle:
+            handle.write(summary.getvalue())
+    with open(prefix + ".collapsed", 'w', encoding='utf-8') as handle:
+        handle.write(sampler.collapsed())
+    with open(prefix + ".json", 'w', encoding='utf-8') as handle:
+        json.dump({
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'page': page,
+            'filters': filters or {},
+            'duration_seconds': round(duration, 4),
+            'samples': sum(sampler.counts.values()),
+            'sample_interval_seconds': interval,
+        }, handle, ensure_ascii=False, sort_keys=True, indent=2, default=str)
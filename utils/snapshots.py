@@ -0,0 +1,355 @@
+"""
+Snapshot-uri columnare (Parquet) pentru fișierele Excel.
+
+Modulul nu depinde de Streamlit, astfel încât poate fi folosit și din
+procesele de warm-up.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from utils.constants import SNAPSHOT_DIR, SNAPSHOT_MAX_APPENDS
+
+# Hash-urile de conținut deja calculate, pe (cale, dimensiune, mtime)
+_content_hashes = {}
+
+
+def file_fingerprint(path):
+    """Amprenta fișierului sursă: dimensiune + mtime + hash de conținut"""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    digest = _content_hashes.get(key)
+    if digest is None:
+        hasher = hashlib.blake2b(digest_size=8)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        _content_hashes[key] = digest
+    return f"{stat.st_size}-{stat.st_mtime_ns}-{digest}"
+
+
+def _layout_tag(columns, schema):
+    """
+    Eticheta scurtă a coloanelor proiectate și a schemei (face parte din
+    numele snapshot-ului, deci orice modificare a lor reconvertește fișierul)
+    """
+    if columns is None and not schema:
+        return "all"
+    layout = repr((columns, sorted((schema or {}).items())))
+    return hashlib.blake2b(layout.encode(), digest_size=4).hexdigest()
+
+
+def _snapshot_path(path, fingerprint, columns=None, schema=None):
+    """Calea snapshot-ului Parquet pentru o anumită versiune a fișierului"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    tag = _layout_tag(columns, schema)
+    return os.path.join(SNAPSHOT_DIR, f"{stem}-{fingerprint}-{tag}.parquet")
+
+
+def _write_snapshot(df, snapshot):
+    """Scrie snapshot-ul atomic și șterge versiunile vechi ale aceluiași fișier"""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp_path = f"{snapshot}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, snapshot)
+
+    stem = os.path.basename(snapshot).rsplit("-", 4)[0]
+    for name in os.listdir(SNAPSHOT_DIR):
+        old = os.path.join(SNAPSHOT_DIR, name)
+        if old != snapshot and name.endswith(".parquet") and name.rsplit("-", 4)[0] == stem:
+            os.remove(old)
+
+
+def _to_column(values):
+    """
+    Transformă valorile unei coloane într-un array tipizat. Ca pd.read_excel,
+    coloanele text care conțin doar numere (și coloanele goale) devin numerice.
+    """
+    series = pd.Series(values)
+    if series.dtype == object or pd.api.types.is_string_dtype(series.dtype):
+        try:
+            return pd.to_numeric(series)
+        except (ValueError, TypeError):
+            pass
+    return series
+
+
+def read_excel_columns(path, columns=None):
+    """
+    Citește din prima foaie doar coloanele cerute, rând cu rând, prin
+    iteratorul read-only al openpyxl.
+
+    Valorile fiecărei coloane sunt acumulate separat și convertite la final
+    în array-uri tipizate, fără a construi grila completă de obiecte.
+    Coloanele cerute care lipsesc din fișier sunt ignorate.
+    """
+    wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, ())
+
+        wanted = set(columns) if columns is not None else None
+        positions = [
+            i for i, name in enumerate(header)
+            if name is not None and (wanted is None or name in wanted)
+        ]
+        values = {i: [] for i in positions}
+        appenders = [(i, values[i].append) for i in positions]
+
+        for row in rows:
+            if not any(cell is not None for cell in row):
+                continue  # Rând gol
+            width = len(row)
+            for i, append in appenders:
+                append(row[i] if i < width else None)
+    finally:
+        wb.close()
+
+    return pd.DataFrame({str(header[i]): _to_column(values[i]) for i in positions})
+
+
+def apply_schema(df, schema):
+    """Aplică schema tipizată (vezi DATASET_SCHEMAS) pe coloanele existente"""
+    if not schema:
+        return df
+    for col in schema.get('dates', []):
+        if col in df.columns:
+            # Unitate fixă: Parquet nu păstrează rezoluția de secunde, iar cadrul
+            # parsat trebuie să fie identic cu cel citit din snapshot
+            df[col] = pd.to_datetime(df[col], errors='coerce').astype('datetime64[us]')
+    for col in schema.get('integers', []):
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in schema.get('floats', []):
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype('float32')
+    for col in schema.get('categories', []):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    sort_by = schema.get('sort_by')
+    # Exporturile vin de obicei deja sortate - sortarea completă doar la nevoie
+    if sort_by in df.columns and not _is_sorted(df[sort_by]):
+        df = df.sort_values(sort_by, kind='stable', na_position='last', ignore_index=True)
+    return df
+
+
+def _store_dir(path, columns=None, schema=None):
+    """Directorul depozitului append-only al unui fișier"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(SNAPSHOT_DIR, f"{stem}-{_layout_tag(columns, schema)}")
+
+
+def _read_manifest(store):
+    try:
+        with open(os.path.join(store, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if isinstance(manifest.get("files"), list) and isinstance(manifest.get("days"), dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"fingerprint": None, "files": [], "days": {}}
+
+
+def _is_sorted(series):
+    """Coloana este crescătoare, cu valorile lipsă doar la final (verificare O(n), fără sortare)"""
+    missing = series.isna().to_numpy()
+    present = len(missing) - int(missing.sum())
+    return not missing[:present].any() and series.iloc[:present].is_monotonic_increasing
+
+
+def _split_days(df, column):
+    """
+    Zilele unui cadru sortat după `column`: etichetele ('YYYY-MM-DD', NaT ->
+    'none') și poziția primului rând al fiecărei zile, din pozițiile la care
+    ziua se schimbă (vectorizat).
+    """
+    days = df[column].to_numpy().astype('datetime64[D]')
+    if not len(days):
+        return [], np.array([], dtype=np.int64)
+    codes = days.view('int64')
+    starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+    labels = ["none" if label == "NaT" else label for label in np.datetime_as_string(days[starts])]
+    return labels, starts
+
+
+def _day_digests(df, labels, starts):
+    """
+    Amprenta fiecărei zile: suma hash-urilor rândurilor (independentă de
+    codurile categoriilor) și numărul de rânduri.
+    """
+    if not labels:
+        return {}
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    sums = np.add.reduceat(row_hashes, starts)
+    counts = np.diff(np.append(starts, len(df)))
+    return {label: f"{total:016x}-{count}" for label, total, count in zip(labels, sums, counts)}
+
+
+def _append_position(manifest, days, labels, starts, total_rows):
+    """
+    Poziția de la care cadrul nou doar adaugă zile după cele din depozit, sau
+    None dacă o zi existentă s-a schimbat, a dispărut, au apărut date lipsă
+    ori zile intercalate - cazuri în care snapshot-ul se rescrie complet.
+    """
+    stored = manifest["days"]
+    if not manifest["files"] or not stored or "none" in stored or "none" in days:
+        return None
+    kept = len(stored)
+    if labels[:kept] != sorted(stored) or any(days[label] != stored[label] for label in labels[:kept]):
+        return None
+    return int(starts[kept]) if kept < len(labels) else total_rows
+
+
+def _remove_stale_stores(store):
+    """Șterge depozitele și snapshot-urile altor layout-uri ale aceluiași fișier"""
+    stem = os.path.basename(store).rsplit("-", 1)[0]
+    for name in os.listdir(SNAPSHOT_DIR):
+        old = os.path.join(SNAPSHOT_DIR, name)
+        if old == store:
+            continue
+        if os.path.isdir(old) and name.rsplit("-", 1)[0] == stem:
+            shutil.rmtree(old, ignore_errors=True)
+        elif name.endswith(".parquet") and name.rsplit("-", 4)[0] == stem:
+            os.remove(old)
+
+
+def _without_unused_categories(df):
+    return df.apply(
+        lambda s: s.cat.remove_unused_categories() if isinstance(s.dtype, pd.CategoricalDtype) else s
+    )
+
+
+def _write_store(df, fingerprint, store, column):
+    """
+    Actualizează depozitul cu cadrul parsat `df`, ordonat după `column`:
+    zilele adăugate după ultima zi existentă se scriu într-un fișier de
+    adăugare (doar rândurile lor), orice altă schimbare - sau prea multe
+    adăugări - rescrie un singur snapshot.
+    """
+    os.makedirs(store, exist_ok=True)
+    manifest = _read_manifest(store)
+    labels, starts = _split_days(df, column)
+    days = _day_digests(df, labels, starts)
+    position = _append_position(manifest, days, labels, starts, len(df))
+
+    name = f"{fingerprint}.parquet"
+    if position is not None and len(manifest["files"]) <= SNAPSHOT_MAX_APPENDS:
+        files = list(manifest["files"])
+        if position < len(df):
+            _without_unused_categories(df.iloc[position:]).to_parquet(os.path.join(store, f"{name}.tmp"), index=False)
+            os.replace(os.path.join(store, f"{name}.tmp"), os.path.join(store, name))
+            files.append(name)
+    else:
+        df.to_parquet(os.path.join(store, f"{name}.tmp"), index=False)
+        os.replace(os.path.join(store, f"{name}.tmp"), os.path.join(store, name))
+        files = [name]
+
+    tmp_manifest = os.path.join(store, "manifest.json.tmp")
+    with open(tmp_manifest, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "files": files, "days": days}, f)
+    os.replace(tmp_manifest, os.path.join(store, "manifest.json"))
+
+    # Fișierele care nu mai fac parte din depozit (inclusiv formatul vechi, pe zile)
+    for old in os.listdir(store):
+        if old != "manifest.json" and old not in files:
+            try:
+                os.remove(os.path.join(store, old))
+            except OSError:
+                pass
+    _remove_stale_stores(store)
+
+
+def _read_store(store, manifest, schema):
+    """Snapshot-ul de bază, urmat de fișierele de adăugare, în ordinea scrierii"""
+    paths = [os.path.join(store, name) for name in manifest["files"]]
+    if len(paths) == 1:
+        return pd.read_parquet(paths[0])
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.concat_tables([pq.read_table(path) for path in paths], promote_options="permissive")
+    df = table.to_pandas()
+    # Dicționarele unificate sunt în ordinea apariției; categoriile rămân sortate
+    for col in schema.get('categories', []):
+        if col in df.columns:
+            df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    return df
+
+
+def read_excel_partitioned(path, columns=None, schema=None):
+    """
+    Citește un fișier Excel de vânzări prin depozitul său append-only: un
+    snapshot Parquet plus, după exporturile care doar adaugă zile noi (după
+    coloana `schema['partition_by']`), câte un fișier cu rândurile acelor zile.
+    După SNAPSHOT_MAX_APPENDS adăugări depozitul se compactează într-un
+    singur snapshot, astfel încât citirea la pornire rămâne de câteva fișiere.
+
+    Excel-ul schimbat trebuie totuși parcurs o dată - formatul nu permite
+    citirea parțială -, dar pe disc se scriu doar zilele noi.
+    """
+    fingerprint = file_fingerprint(path)
+    store = _store_dir(path, columns, schema)
+    manifest = _read_manifest(store)
+    if manifest["fingerprint"] == fingerprint and manifest["files"]:
+        try:
+            return _read_store(store, manifest, schema)
+        except Exception:
+            pass  # Fișier corupt sau motor Parquet lipsă - se reingerează
+
+    column = schema['partition_by']
+    df = apply_schema(read_excel_columns(path, columns), schema)
+    if column not in df.columns:
+        return df
+    if not _is_sorted(df[column]):
+        df = df.sort_values(column, kind='stable', na_position='last', ignore_index=True)
+    try:
+        _write_store(df, fingerprint, store, column)
+    except Exception:
+        pass  # Depozitul este doar o optimizare (ex. coloană cu numere și text, pe care Parquet o refuză)
+    return df
+
+
+def has_snapshot(path, columns=None, schema=None):
+    """Verifică dacă versiunea curentă a fișierului are deja snapshot"""
+    if schema and schema.get('partition_by'):
+        return _read_manifest(_store_dir(path, columns, schema))["fingerprint"] == file_fingerprint(path)
+    return os.path.exists(_snapshot_path(path, file_fingerprint(path), columns, schema))
+
+
+def read_excel_snapshot(path, columns=None, schema=None):
+    """
+    Citește un fișier Excel prin snapshot-ul său columnar.
+
+    La prima citire a unei versiuni (dimensiune + mtime + hash) fișierul este
+    parsat cu openpyxl (doar coloanele din `columns`), tipizat conform
+    `schema` și salvat ca Parquet; citirile ulterioare folosesc snapshot-ul,
+    care păstrează tipurile. Dacă Parquet nu este disponibil, se citește
+    direct Excel-ul. Seturile cu `partition_by` în schemă folosesc depozitul
+    partiționat pe zile (vezi read_excel_partitioned).
+    """
+    if schema and schema.get('partition_by'):
+        return read_excel_partitioned(path, columns, schema)
+
+    snapshot = _snapshot_path(path, file_fingerprint(path), columns, schema)
+    if os.path.exists(snapshot):
+        try:
+            return pd.read_parquet(snapshot)
+        except Exception:
+            pass  # Snapshot corupt sau motor Parquet lipsă - se reconvertește
+
+    df = apply_schema(read_excel_columns(path, columns), schema)
+    try:
+        _write_snapshot(df, snapshot)
+    except Exception:
+        pass  # Snapshot-ul este doar o optimizare
+    return df
@@ -0,0 +1,123 @@
+"""
+Backend SQL încorporat (DuckDB) pentru agregările paginilor.
+
+DuckDB este opțional: dacă nu este instalat, aceleași agregări se calculează
+cu pandas (vezi aggregate_frame), cu rezultat identic.
+"""
+
+import threading
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Operatorii acceptați în filtrele (coloană, operator, valoare)
+FILTER_OPERATORS = ('in', '=', '>', '>=', '<', '<=')
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _check_filters(filters):
+    for column, op, value in filters:
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Operator necunoscut în filtru: {op!r}")
+
+
+def aggregate_sql(table, by, measures, filters=(), dropna=True, count=None):
+    """
+    Interogarea SQL (cu parametri) pentru suma măsurilor pe dimensiunile
+    `by`, opțional cu numărul de rânduri în coloana `count`. Ca groupby din
+    pandas, rezultatul este ordonat după chei, iar grupurile cu chei lipsă
+    sunt excluse doar dacă `dropna`.
+    """
+    _check_filters(filters)
+    keys = ", ".join(_quote(col) for col in by)
+    columns = [f"COALESCE(SUM({_quote(col)}), 0) AS {_quote(col)}" for col in measures]
+    if count:
+        columns.append(f"COUNT(*) AS {_quote(count)}")
+
+    conditions = [f"{_quote(col)} IS NOT NULL" for col in by] if dropna else []
+    params = []
+    for column, op, value in filters:
+        if op == 'in':
+            values = list(value)
+            if not values:
+                conditions.append("FALSE")
+                continue
+            conditions.append(f"{_quote(column)} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        else:
+            conditions.append(f"{_quote(column)} {op} ?")
+            params.append(value)
+
+    sql = f"SELECT {keys}, {', '.join(columns)} FROM {_quote(table)}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    order = ", ".join(f"{_quote(col)} NULLS LAST" for col in by)
+    sql += f" GROUP BY {keys} ORDER BY {order}"
+    return sql, params
+
+
+def aggregate_frame(df, by, measures, filters=(), dropna=True, count=None):
+    """Aceeași agregare ca aggregate_sql, calculată direct cu pandas"""
+    _check_filters(filters)
+    mask = None
+    for column, op, value in filters:
+        series = df[column]
+        if op == 'in':
+            condition = series.isin(list(value))
+        elif op == '=':
+            condition = series == value
+        elif op == '>':
+            condition = series > value
+        elif op == '>=':
+            condition = series >= value
+        elif op == '<':
+            condition = series < value
+        else:
+            condition = series <= value
+        mask = condition if mask is None else mask & condition
+
+    selected = df if mask is None else df[mask.fillna(False).to_numpy(dtype=bool)]
+    groups = selected.groupby(by, observed=True, dropna=dropna)
+    result = groups[measures].sum()
+    if count:
+        result[count] = groups.size()
+    return result.reset_index()
+
+
+class SqlBackend:
+    """
+    Conexiune DuckDB în memorie în care seturile de date sunt înregistrate
+    direct peste cadrele pandas (fără copiere); agregările sunt executate de
+    motorul columnar, pe mai multe fire, iar în Python ajung doar grupurile.
+    """
+
+    def __init__(self):
+        if duckdb is None:
+            raise ImportError("DuckDB nu este instalat")
+        self._con = duckdb.connect(database=":memory:")
+        self._lock = threading.Lock()
+        self._registered = {}
+
+    def aggregate(self, table, token, df, by, measures, filters=(), dropna=True, count=None):
+        """
+        Suma măsurilor pe dimensiunile `by` (vezi aggregate_sql). Cadrul `df`
+        este (re)înregistrat sub numele `table` doar când `token` se schimbă.
+        """
+        sql, params = aggregate_sql(table, by, measures, filters, dropna, count)
+        with self._lock:
+            if self._registered.get(table) != token:
+                self._con.register(table, df)
+                self._registered[table] = token
+            result = self._con.execute(sql, params).df()
+        # Coloanele ENUM revin ca categorii ordonate; ca în pandas, fără ordine
+        for col in by:
+            if isinstance(result[col].dtype, pd.CategoricalDtype):
+                result[col] = result[col].cat.as_unordered()
+        return result
@@ -0,0 +1,134 @@
+"""
+Măsurarea duratei fazelor unei rulări de pagină (încărcare, filtrare,
+agregare, grafice, tabel), fără dependențe de Streamlit.
+
+O rulare este activă doar pe firul care a pornit-o (start_rerun); în afara
+ei span() și phase() nu fac nimic, astfel încât instrumentarea rămasă în
+pagini costă doar o citire de atribut când măsurarea este dezactivată.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+_state = threading.local()
+_write_lock = threading.Lock()
+_NO_SPAN = nullcontext()
+
+
+class Rerun:
+    """
+    Span-urile unei rulări, în ordinea deschiderii: nume, adâncime, începutul
+    și durata în milisecunde față de pornirea rulării. Fazele (phase) sunt
+    span-uri de nivel superior care se închid la începutul fazei următoare.
+    """
+
+    def __init__(self, session_id, page):
+        self.session_id = session_id
+        self.page = page
+        self.started = time.perf_counter()
+        self.spans = []
+        self._open = []
+        self._phase = None
+
+    def open(self, name):
+        self.spans.append({
+            'name': name,
+            'depth': len(self._open),
+            'start_ms': (time.perf_counter() - self.started) * 1000,
+            'duration_ms': None,
+        })
+        self._open.append(len(self.spans) - 1)
+        return self._open[-1]
+
+    def close(self, position):
+        # Span-urile interioare rămase deschise (ex. după o excepție) se închid odată cu părintele
+        while self._open and self._open[-1] >= position:
+            span = self.spans[self._open.pop()]
+            span['duration_ms'] = (time.perf_counter() - self.started) * 1000 - span['start_ms']
+
+    def phase(self, name):
+        if self._phase is not None:
+            self.close(self._phase)
+        self._phase = self.open(name) if name is not None else None
+
+    def record(self, filters=None):
+        """Rularea ca dicționar serializabil (o linie JSONL); închide span-urile rămase deschise"""
+        if self._open:
+            self.close(self._open[0])
+        return {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'session_id': self.session_id,
+            'page': self.page,
+            'filters': filters or {},
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'spans': [dict(span, start_ms=round(span['start_ms'], 3), duration_ms=round(span['duration_ms'], 3))
+                      for span in self.spans],
+        }
+
+
+class _Span:
+    __slots__ = ('rerun', 'name', 'position')
+
+    def __init__(self, rerun, name):
+        self.rerun = rerun
+        self.name = name
+
+    def __enter__(self):
+        self.position = self.rerun.open(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.rerun.close(self.position)
+        return False
+
+
+def start_rerun(session_id, page):
+    """Pornește măsurarea unei rulări pe firul curent"""
+    _state.rerun = Rerun(session_id, page)
+    return _state.rerun
+
+
+def finish_rerun(filters=None):
+    """Oprește măsurarea pe firul curent și întoarce rularea (vezi Rerun.record), sau None"""
+    rerun = getattr(_state, 'rerun', None)
+    _state.rerun = None
+    return rerun.record(filters) if rerun is not None else None
+
+
+def span(name):
+    """
+    Context care măsoară un bloc, imbricat în faza sau span-ul curent:
+
+        with span("figură"):
+            fig = build()
+    """
+    rerun = getattr(_state, 'rerun', None)
+    if rerun is None:
+        return _NO_SPAN
+    return _Span(rerun, name)
+
+
+def phase(name):
+    """
+    Începe faza `name` a paginii, închizând faza precedentă; phase(None)
+    închide faza curentă. Pentru scripturile de pagină, unde un bloc `with`
+    ar reindenta tot codul.
+    """
+    rerun = getattr(_state, 'rerun', None)
+    if rerun is not None:
+        rerun.phase(name)
+
+
+def append_jsonl(path, record):
+    """Adaugă rularea ca o linie JSON la sfârșitul fișierului `path`"""
+    line = json.dumps(record, ensure_ascii=False, sort_keys=True, default=str)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with _write_lock:
+        with open(path, 'a', encoding='utf-8') as handle:
+            handle.write(line + "\n")